@@ -0,0 +1,15 @@
+"""
+Benchmarks for Flask-CORS. These are not part of the test suite.
+
+- `python -m benchmarks` runs the microbenchmarks of the per-request functions.
+- `python -m benchmarks.origin_matching` times origin matching against
+  policies mixing literal origins and regular expressions, and optionally the
+  linear scan it replaced.
+- `python -m benchmarks.e2e` measures the per-request CORS overhead end to end.
+- `python -m benchmarks.loadtest` measures latency percentiles of the example
+  apps under concurrent load.
+- `python -m benchmarks.allocations` measures the memory allocated per request
+  on the CORS code path.
+
+See `--help` of each for how to save and compare results.
+"""
@@ -0,0 +1,53 @@
+"""
+Runs the Flask-CORS microbenchmarks.
+
+    python -m benchmarks                           # run and print the results
+    python -m benchmarks --save baseline.json      # ... and save them as a baseline
+    python -m benchmarks --compare baseline.json   # ... and compare them to a baseline
+
+When comparing, the exit status is 1 if any benchmark is slower than the
+baseline by more than the threshold (10% by default). Baselines are only
+comparable when taken on the same machine, with the same Python and Flask.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import micro, runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the Flask-CORS microbenchmarks.")
+    parser.add_argument("--quick", action="store_true", help="use fewer origin and resource counts")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark (default: 5)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results to a JSON baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown beyond which a benchmark is flagged when comparing (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    results = runner.run(micro.cases(quick=args.quick), name_filter=args.filter, repeat=args.repeat)
+
+    if args.save:
+        runner.save(results, args.save)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        print(f"\nCompared to {args.compare}:")
+        regressions = runner.compare(results, runner.load(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Memory allocation benchmark of the CORS code path, using tracemalloc. For each
+common request shape, the extension's after_request function (or, for the
+decorator, `set_cors_headers`) is run on an existing response inside a
+request context, and the following are reported per request:
+
+- peak_bytes: the most memory allocated at any point during the call, above
+  what was allocated before it, i.e. the size of the temporary objects (lists,
+  MultiDicts, strings, ...) it creates.
+- retained_bytes and retained_blocks: the memory, and number of memory blocks,
+  still allocated after the call, averaged over many requests; non-zero
+  values point at objects kept alive, e.g. by an unbounded cache.
+
+tracemalloc only tracks memory which is still allocated, so it cannot count
+every short-lived allocation; the peak is the closest measure of how many
+temporary objects a request creates.
+
+    python -m benchmarks.allocations --save allocations.json
+    python -m benchmarks.allocations --compare allocations.json
+
+When comparing, the exit status is 1 if any value went up (by more than
+--threshold, 0 by default).
+"""
+
+import argparse
+import array
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request
+
+from benchmarks import runner
+from flask_cors.core import (
+    ACL_REQUEST_HEADERS,
+    ACL_REQUEST_METHOD,
+    CORS_REQUEST_ENVIRON_KEY,
+    DEFAULT_OPTIONS,
+    CorsPolicy,
+    parse_resources,
+    serialize_options,
+    set_cors_headers,
+)
+from flask_cors.extension import (
+    make_after_request_function,
+    make_decision_function,
+    make_resource_lookup,
+)
+
+ORIGIN = "https://app.example.com"
+ORIGINS = [ORIGIN, "https://admin.example.com", r"https://.*\.partner\.example\.com"]
+
+SHAPES = {
+    "simple": ("GET", "/api/items", {"Origin": ORIGIN}),
+    "preflight": (
+        "OPTIONS",
+        "/api/items",
+        {"Origin": ORIGIN, ACL_REQUEST_METHOD: "POST", ACL_REQUEST_HEADERS: "Content-Type, Authorization"},
+    ),
+    "rejected": ("GET", "/api/items", {"Origin": "https://attacker.example.net"}),
+    "no-origin": ("GET", "/api/items", {}),
+    "not-found": ("GET", "/api/missing", {"Origin": ORIGIN}),
+}
+
+
+def make_app():
+    app = Flask(__name__)
+    app.add_url_rule("/api/items", "items", lambda: "[]", methods=["GET", "POST"])
+    policy = CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, origins=ORIGINS)))
+    resources = [(pattern, policy) for pattern, _ in parse_resources({r"/api/.*": {}, r"/static/.*": {}})]
+    cors_after_request = make_after_request_function(make_decision_function(make_resource_lookup(resources)))
+    return app, policy, cors_after_request
+
+
+def measure(app, call, method, path, headers, number):
+    """Returns the peak and retained memory per call of `call(response)`."""
+    with app.test_request_context(path, method=method, headers=headers):
+        # Fill any caches, and the interpreter's free lists, first, so they do
+        # not count as retained memory.
+        environ = request.environ
+        responses = [app.response_class() for _ in range(number)]
+        for resp in responses:
+            environ.pop(CORS_REQUEST_ENVIRON_KEY, None)
+            call(resp)
+        del responses, resp
+
+        # Create the responses up front, so that only the CORS code path is
+        # traced.
+        responses = [app.response_class() for _ in range(number)]
+        tracemalloc.start()
+        try:
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            start_blocks = _traced_blocks()
+            # Preallocated, so that storing the results allocates nothing.
+            peaks = array.array("q", bytes(8 * number))
+            for i in range(number):
+                # Evaluate each call as a new request.
+                environ.pop(CORS_REQUEST_ENVIRON_KEY, None)
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                call(responses[i])
+                peaks[i] = tracemalloc.get_traced_memory()[1] - before
+            del responses
+            retained_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+            retained_blocks = _traced_blocks() - start_blocks
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "peak_bytes": sorted(peaks)[len(peaks) // 2],
+        "retained_bytes": max(0, retained_bytes) / number,
+        "retained_blocks": max(0, retained_blocks) / number,
+    }
+
+
+def _traced_blocks():
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return sum(stat.count for stat in snapshot.statistics("filename"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.allocations", description="Measure CORS allocations.")
+    parser.add_argument("--number", type=int, default=1000, help="requests per measurement (default: 1000)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results to a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.0, help="relative increase to flag (default: 0)")
+    args = parser.parse_args(argv)
+
+    app, policy, cors_after_request = make_app()
+    calls = {
+        "extension": cors_after_request,
+        "decorator": lambda resp: set_cors_headers(resp, policy),
+    }
+
+    results = {}
+    print(f"{'request':<32}{'peak bytes':>12}{'retained bytes':>16}{'retained blocks':>17}")
+    for call_name, call in calls.items():
+        for shape, (method, path, headers) in SHAPES.items():
+            name = f"{call_name},{shape}"
+            measured = measure(app, call, method, path, headers, args.number)
+            print(
+                f"{name:<32}{measured['peak_bytes']:>12}{measured['retained_bytes']:>16.1f}"
+                f"{measured['retained_blocks']:>17.2f}"
+            )
+            for key, value in measured.items():
+                results[f"allocations[{name}].{key}"] = value
+
+    if args.save:
+        runner.save(results, args.save)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        print(f"\nCompared to {args.compare}:")
+        regressions = runner.compare(results, runner.load(args.compare), args.threshold, label="MORE")
+        if regressions:
+            print(f"\n{len(regressions)} value(s) went up")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+End to end "CORS tax" benchmark: the same Flask app is driven through the
+WSGI test client with no CORS, the `CORS` extension, the `cross_origin`
+decorator and both together, for preflight, simple GET, rejected origin and
+404 traffic. The output is a table of the time per request and requests per
+second of each mode, and of the overhead of each CORS mode over no CORS.
+
+    python -m benchmarks.e2e
+    python -m benchmarks.e2e --save e2e.json
+    python -m benchmarks.e2e --compare e2e.json
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from benchmarks import runner
+from flask_cors import CORS, cross_origin
+
+MODES = ["none", "extension", "decorator", "both"]
+ALLOWED_ORIGINS = ["https://app.example.com", "https://admin.example.com"]
+
+TRAFFIC = {
+    "preflight": (
+        "OPTIONS",
+        "/api/items",
+        {
+            "Origin": "https://app.example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "Content-Type, Authorization",
+        },
+    ),
+    "simple": ("GET", "/api/items", {"Origin": "https://app.example.com"}),
+    "rejected": ("GET", "/api/items", {"Origin": "https://attacker.example.net"}),
+    "not-found": ("GET", "/api/missing", {"Origin": "https://app.example.com"}),
+}
+
+
+def make_app(mode):
+    app = Flask(__name__)
+    if mode in ("extension", "both"):
+        CORS(app, origins=ALLOWED_ORIGINS)
+
+    def items():
+        return "[]"
+
+    if mode in ("decorator", "both"):
+        items = cross_origin(origins=ALLOWED_ORIGINS)(items)
+
+    app.add_url_rule("/api/items", "items", items, methods=["GET", "POST"])
+    return app
+
+
+def time_per_request(app, method, path, headers, number, repeat):
+    """Returns the best time of a request, in microseconds."""
+    client = app.test_client()
+
+    def send():
+        client.open(path, method=method, headers=headers).close()
+
+    send()
+    return min(timeit.repeat(send, number=number, repeat=repeat)) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.e2e", description="Measure the per-request CORS tax.")
+    parser.add_argument("--number", type=int, default=2000, help="requests per timing run (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per measurement (default: 5)")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results to a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown to flag (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    apps = {mode: make_app(mode) for mode in MODES}
+    results = {}
+    for traffic, (method, path, headers) in TRAFFIC.items():
+        for mode, app in apps.items():
+            results[f"e2e[{mode},{traffic}]"] = (
+                time_per_request(app, method, path, headers, args.number, args.repeat) * 1e3
+            )
+
+    print(f"{'traffic':<12}{'cors':<12}{'us/req':>10}{'req/s':>10}{'overhead us':>14}{'overhead':>10}")
+    for traffic in TRAFFIC:
+        base = results[f"e2e[none,{traffic}]"] / 1e3
+        for mode in MODES:
+            per_request = results[f"e2e[{mode},{traffic}]"] / 1e3
+            print(
+                f"{traffic:<12}{mode:<12}{per_request:>10.1f}{1e6 / per_request:>10.0f}"
+                f"{per_request - base:>+14.1f}{per_request / base - 1:>+10.1%}"
+            )
+
+    if args.save:
+        runner.save(results, args.save)
+        print(f"\nSaved {len(results)} results (ns per request) to {args.save}")
+
+    if args.compare:
+        print(f"\nCompared to {args.compare}:")
+        if runner.compare(results, runner.load(args.compare), args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Concurrent load test of the example apps under `examples/`, each served by a
+local, threaded Werkzeug server, with and without CORS. Preflight and actual
+requests are sent over keep-alive connections from a pool of threads, and the
+p50, p95 and p99 latencies are reported, which shows contention (e.g. on
+locks in a caching layer) that a single-threaded loop hides.
+
+"Without CORS", the example is loaded with `CORS` and `cross_origin` replaced
+by no-ops, so that the apps are otherwise identical.
+
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --concurrency 16 --requests 5000 --examples app_based
+"""
+
+import argparse
+import http.client
+import importlib.util
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EXAMPLES = {
+    "app_based": "/api/v1/users/",
+    "view_based": "/api/v1/users/create",
+    "blueprints_based": "/api/v1/users/",
+}
+PREFLIGHT_PATH = "/api/v1/users/create"
+ORIGIN = "https://www.examplesite.com"
+
+REQUESTS = {
+    "preflight": (
+        "OPTIONS",
+        PREFLIGHT_PATH,
+        {"Origin": ORIGIN, "Access-Control-Request-Method": "POST", "Access-Control-Request-Headers": "Content-Type"},
+    ),
+    "actual": ("GET", None, {"Origin": ORIGIN}),
+}
+
+
+def _no_cors_module():
+    module = types.ModuleType("flask_cors")
+
+    class CORS:
+        def __init__(self, app=None, **kwargs):
+            pass
+
+        def init_app(self, app, **kwargs):
+            pass
+
+    module.CORS = CORS
+    module.cross_origin = lambda *args, **kwargs: lambda f: f
+    return module
+
+
+def load_example(name, cors=True):
+    """Imports `examples/<name>_example.py` as a new module and returns its app."""
+    path = os.path.join(ROOT, "examples", f"{name}_example.py")
+    spec = importlib.util.spec_from_file_location(f"loadtest_{name}_{'cors' if cors else 'no_cors'}", path)
+    module = importlib.util.module_from_spec(spec)
+
+    flask_cors = sys.modules.get("flask_cors")
+    if not cors:
+        sys.modules["flask_cors"] = _no_cors_module()
+    logging.disable(logging.INFO)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        logging.disable(logging.NOTSET)
+        if flask_cors is not None:
+            sys.modules["flask_cors"] = flask_cors
+        else:
+            sys.modules.pop("flask_cors", None)
+
+    # The examples turn on (debug) logging, which would dominate the timings.
+    logging.getLogger("flask_cors").setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    return module.app
+
+
+class Server:
+    """Serves a WSGI app from a threaded Werkzeug server in the background."""
+
+    def __init__(self, app):
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def run_load(port, method, path, headers, requests, concurrency):
+    """
+    Sends `requests` requests from `concurrency` threads, each with its own
+    keep-alive connection, and returns the sorted latencies in milliseconds
+    and the overall throughput in requests per second.
+    """
+    local = threading.local()
+
+    def send(_):
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection("127.0.0.1", port)
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, headers=headers)
+            connection.getresponse().read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            local.connection = None
+            raise
+        return (time.perf_counter() - start) * 1e3
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(send, range(concurrency * 4)))  # warm up
+        start = time.perf_counter()
+        latencies = sorted(pool.map(send, range(requests)))
+        elapsed = time.perf_counter() - start
+    return latencies, requests / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest", description="Load test the example apps.")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per measurement (default: 2000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client threads (default: 8)")
+    parser.add_argument("--examples", nargs="+", choices=sorted(EXAMPLES), default=sorted(EXAMPLES))
+    args = parser.parse_args(argv)
+
+    print(f"{args.requests} requests per row, {args.concurrency} concurrent connections")
+    print(f"{'example':<18}{'request':<11}{'cors':<6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+    for name in args.examples:
+        for cors in (False, True):
+            app = load_example(name, cors=cors)
+            with Server(app) as server:
+                for kind, (method, path, headers) in REQUESTS.items():
+                    latencies, throughput = run_load(
+                        server.port, method, path or EXAMPLES[name], headers, args.requests, args.concurrency
+                    )
+                    print(
+                        f"{name:<18}{kind:<11}{'on' if cors else 'off':<6}"
+                        f"{percentile(latencies, 50):>9.3f}{percentile(latencies, 95):>9.3f}"
+                        f"{percentile(latencies, 99):>9.3f}{throughput:>9.0f}"
+                    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Microbenchmarks of the functions on Flask-CORS's per-request path:
+`get_cors_origins`, `get_cors_headers`, `get_allow_headers`,
+`set_cors_headers` and the extension's `cors_after_request`, across numbers
+of origins and resources, literal and regex patterns, and simple and preflight
+requests.
+
+Each case is a (name, func, context) tuple; `context`, if not None, is entered
+around the timing of `func`, e.g. to push a request context.
+"""
+
+from flask import Flask, request
+from werkzeug.datastructures import Headers
+
+from flask_cors.core import (
+    ACL_REQUEST_HEADERS,
+    ACL_REQUEST_METHOD,
+    CORS_REQUEST_ENVIRON_KEY,
+    DEFAULT_OPTIONS,
+    CorsPolicy,
+    get_allow_headers,
+    get_cors_headers,
+    get_cors_origins,
+    parse_resources,
+    serialize_options,
+    set_cors_headers,
+)
+from flask_cors.extension import make_after_request_function, make_decision_function, make_resource_lookup
+
+ORIGIN_COUNTS = [1, 10, 100, 1000, 10000, 100000]
+RESOURCE_COUNTS = [1, 10, 100, 1000]
+QUICK_ORIGIN_COUNTS = [1, 100, 10000]
+QUICK_RESOURCE_COUNTS = [1, 100]
+# Compiling (and, on a hit, matching) an alternation of this many regexes is
+# already far beyond any realistic configuration.
+MAX_REGEX_ORIGINS = 1000
+
+REQUEST_HEADERS = "Content-Type, Authorization, X-Requested-With, X-Request-Id, X-Client-Version"
+
+
+def make_policy(**options):
+    return CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, **options)))
+
+
+def make_origins(count, kind):
+    if kind == "literal":
+        return [f"https://partner{i}.example.com" for i in range(count)]
+    return [rf"https://[a-z]+\.partner{i}\.example\.com" for i in range(count)]
+
+
+def matching_origin(count, kind):
+    i = count - 1
+    return f"https://partner{i}.example.com" if kind == "literal" else f"https://api.partner{i}.example.com"
+
+
+def make_resources(count, kind):
+    if kind == "literal":
+        return {f"/api/r{i}": {} for i in range(count)}
+    return {rf"/api/r{i}/\d+": {} for i in range(count)}
+
+
+def matching_path(count, kind):
+    return f"/api/r{count - 1}" if kind == "literal" else f"/api/r{count - 1}/1"
+
+
+def simple_headers(origin):
+    return Headers({"Origin": origin})
+
+
+def preflight_headers(origin):
+    return Headers({"Origin": origin, ACL_REQUEST_METHOD: "PUT", ACL_REQUEST_HEADERS: REQUEST_HEADERS})
+
+
+def origin_cases(origin_counts):
+    for kind in ("literal", "regex"):
+        for count in origin_counts:
+            if kind == "regex" and count > MAX_REGEX_ORIGINS:
+                continue
+            policy = make_policy(origins=make_origins(count, kind))
+            for outcome, origin in (("hit", matching_origin(count, kind)), ("miss", "https://attacker.example.net")):
+                yield (
+                    f"get_cors_origins[{kind},origins={count},{outcome}]",
+                    lambda policy=policy, origin=origin: get_cors_origins(policy, origin),
+                    None,
+                )
+
+
+def header_cases(origin_counts):
+    for count in origin_counts:
+        policy = make_policy(origins=make_origins(count, "literal"))
+        origin = matching_origin(count, "literal")
+        for kind, headers, method in (
+            ("simple", simple_headers(origin), "GET"),
+            ("preflight", preflight_headers(origin), "OPTIONS"),
+        ):
+            yield (
+                f"get_cors_headers[{kind},origins={count}]",
+                lambda policy=policy, headers=headers, method=method: get_cors_headers(policy, headers, method),
+                None,
+            )
+
+    default_policy = make_policy()
+    yield (
+        "get_cors_headers[no-origin,default]",
+        lambda: get_cors_headers(default_policy, Headers(), "GET"),
+        None,
+    )
+
+
+def allow_headers_cases():
+    for name, allow_headers in (
+        ("wildcard", "*"),
+        ("literal", [h.strip() for h in REQUEST_HEADERS.split(",")]),
+        ("regex", [r"X-.*", "Content-Type", "Authorization"]),
+    ):
+        policy = make_policy(allow_headers=allow_headers)
+        yield (
+            f"get_allow_headers[{name}]",
+            lambda policy=policy: get_allow_headers(policy, REQUEST_HEADERS),
+            None,
+        )
+
+
+class _Response:
+    """The least a response needs for set_cors_headers."""
+
+    def __init__(self):
+        self.headers = Headers()
+
+
+def as_new_request(func):
+    """
+    Wraps `func` to first forget what Flask-CORS keeps about the current
+    request, i.e. its inputs and decision, so that each call is timed as the
+    first evaluation of a new request.
+    """
+
+    def call():
+        request.environ.pop(CORS_REQUEST_ENVIRON_KEY, None)
+        return func()
+
+    return call
+
+
+def set_headers_cases():
+    app = Flask(__name__)
+    policy = make_policy(origins=make_origins(10, "literal"))
+    origin = matching_origin(10, "literal")
+    for kind, headers, method in (
+        ("simple", simple_headers(origin), "GET"),
+        ("preflight", preflight_headers(origin), "OPTIONS"),
+    ):
+        yield (
+            f"set_cors_headers[{kind}]",
+            as_new_request(lambda: set_cors_headers(_Response(), policy)),
+            app.test_request_context("/", method=method, headers=headers),
+        )
+
+
+def after_request_cases(resource_counts):
+    for kind in ("literal", "regex"):
+        for count in resource_counts:
+            app = Flask(__name__)
+            resources = [(pattern, make_policy()) for pattern, _ in parse_resources(make_resources(count, kind))]
+            cors_after_request = make_after_request_function(make_decision_function(make_resource_lookup(resources)))
+            path = matching_path(count, kind)
+            # Route the matching path to a static rule, and everything else to
+            # a rule with variables, so both ways of finding a resource are
+            # covered.
+            app.add_url_rule(path, "static_rule", lambda: "")
+            app.add_url_rule("/<path:path>", "dynamic_rule", lambda path: "")
+
+            for outcome, request_path in (("static-rule", path), ("dynamic-rule", "/api/none"), ("no-rule", "/")):
+                for request_kind, headers, method in (
+                    ("simple", simple_headers("https://example.com"), "GET"),
+                    ("preflight", preflight_headers("https://example.com"), "OPTIONS"),
+                ):
+                    yield (
+                        f"cors_after_request[{kind},resources={count},{outcome},{request_kind}]",
+                        as_new_request(lambda cors_after_request=cors_after_request: cors_after_request(_Response())),
+                        app.test_request_context(request_path, method=method, headers=headers),
+                    )
+
+
+def cases(quick=False):
+    origin_counts = QUICK_ORIGIN_COUNTS if quick else ORIGIN_COUNTS
+    resource_counts = QUICK_RESOURCE_COUNTS if quick else RESOURCE_COUNTS
+    yield from origin_cases(origin_counts)
+    yield from header_cases(origin_counts)
+    yield from allow_headers_cases()
+    yield from set_headers_cases()
+    yield from after_request_cases(resource_counts)
@@ -0,0 +1,73 @@
+"""
+Origin matching benchmark
+=========================
+Times `get_cors_origins` against policies with an increasing number of
+allowed origins, for an allowed literal origin, an origin allowed by one of
+a handful of regular expressions, and a rejected origin. With literal origins
+looked up in a set and the regular expressions combined into one pattern, the
+latency should stay flat from 10 to 100k origins.
+
+Unlike the `get_cors_origins` microbenchmarks, whose policies only allow
+literal origins or only regular expressions, these policies mix both, as real
+configurations do.
+
+    python -m benchmarks.origin_matching
+    python -m benchmarks.origin_matching --legacy   # ... and time the linear scan
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_cors.core import CorsPolicy, get_cors_origins, serialize_options, try_match_any_pattern
+
+ORIGIN_COUNTS = [10, 100, 1000, 10000, 100000]
+REGEX_ORIGINS = [r"https://.*\.partner\.example", r"https://review-\d+\.example\.com"]
+
+
+def make_origins(count):
+    return [f"https://partner{i}.example.com" for i in range(count - len(REGEX_ORIGINS))] + REGEX_ORIGINS
+
+
+def time_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    parser.add_argument("--legacy", action="store_true", help="also time the linear try_match_any_pattern scan")
+    args = parser.parse_args(argv)
+
+    cases = {
+        "literal hit": "https://partner5.example.com",
+        "regex hit": "https://api.partner.example",
+        "miss": "https://attacker.example.net",
+    }
+
+    header = f"{'origins':>8}" + "".join(f"{name + ' (us)':>18}" for name in cases)
+    if args.legacy:
+        header += f"{'legacy miss (us)':>18}"
+    print(header)
+
+    for count in ORIGIN_COUNTS:
+        origins = make_origins(count)
+        policy = CorsPolicy(
+            serialize_options({"origins": origins, "supports_credentials": False, "send_wildcard": False})
+        )
+        row = f"{count:>8}"
+        for origin in cases.values():
+            row += f"{time_call(lambda policy=policy, origin=origin: get_cors_origins(policy, origin), args.number):>18.3f}"
+        if args.legacy:
+            number = max(1, args.number // count)
+            miss = cases["miss"]
+            legacy_miss = lambda origins=origins, miss=miss: try_match_any_pattern(miss, origins, caseSensitive=False)
+            row += f"{time_call(legacy_miss, number):>18.3f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
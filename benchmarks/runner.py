@@ -0,0 +1,83 @@
+"""
+Helpers shared by the benchmarks: timing, saving results as JSON baselines,
+and comparing results against a baseline.
+"""
+
+import json
+import platform
+import sys
+import timeit
+from contextlib import nullcontext
+from importlib.metadata import version
+
+
+def measure(func, repeat=5, min_time=0.05):
+    """
+    Returns the best time, in nanoseconds, of a single call to `func`. The
+    number of calls per timing run is picked so that each run takes at least
+    `min_time` seconds.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 4
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run(cases, name_filter=None, repeat=5, min_time=0.05, out=sys.stdout):
+    """
+    Times each (name, func, context) case, with `context` (if any) entered
+    around the timing, and returns a dictionary of name to nanoseconds per
+    call.
+    """
+    results = {}
+    for name, func, context in cases:
+        if name_filter and name_filter not in name:
+            continue
+        with context or nullcontext():
+            results[name] = measure(func, repeat=repeat, min_time=min_time)
+        print(f"{name:<72} {results[name]:>12.0f} ns", file=out)
+    return results
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "flask": version("flask"),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results, baseline, threshold, out=sys.stdout, label="SLOWER"):
+    """
+    Prints how each result compares to the baseline, and returns the names of
+    the results which are higher (i.e. slower) than the baseline by more than
+    `threshold`, e.g. 0.1 for 10%. These are flagged with `label`.
+    """
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline:
+            print(f"{name:<72} {'(new)':>12}", file=out)
+            continue
+        if baseline[name]:
+            change = value / baseline[name] - 1
+        else:
+            change = float("inf") if value > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            flag = f"  {label}"
+            regressions.append(name)
+        print(f"{name:<72} {change:>+11.1%}{flag}", file=out)
+    return regressions
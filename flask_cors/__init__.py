@@ -1,8 +1,9 @@
+from .core import current_decision
 from .decorator import cross_origin
 from .extension import CORS
 from .version import __version__
 
-__all__ = ["CORS", "__version__", "cross_origin"]
+__all__ = ["CORS", "__version__", "cross_origin", "current_decision"]
 
 # Set default logging handler to avoid "No handler found" warnings.
 import logging
@@ -1,9 +1,13 @@
 import logging
 import re
+from collections import OrderedDict, namedtuple
 from collections.abc import Iterable
+from copy import copy
 from datetime import timedelta
+from threading import Lock
+from weakref import WeakKeyDictionary
 
-from flask import current_app, request
+from flask import Flask, current_app, request
 from werkzeug.datastructures import Headers, MultiDict
 
 LOG = logging.getLogger(__name__)
@@ -37,15 +41,38 @@ CONFIG_OPTIONS = [
     "CORS_INTERCEPT_EXCEPTIONS",
     "CORS_ALWAYS_SEND",
     "CORS_ALLOW_PRIVATE_NETWORK",
+    "CORS_HEADER_CACHE_SIZE",
+    "CORS_INTERCEPT_PREFLIGHT",
+    "CORS_PREFLIGHT_CACHE_SIZE",
+    "CORS_REJECT_PREFLIGHT_STATUS",
+    "CORS_SKIP_SAME_ORIGIN",
+    "CORS_TRUST_FETCH_METADATA",
+    "CORS_EXCLUDE_PATHS",
+    "CORS_EXCLUDE_ENDPOINTS",
+    "CORS_ROUTE_METHODS",
 ]
 # Attribute added to request object by decorator to indicate that CORS
 # was evaluated, in case the decorator and extension are both applied
 # to a view.
 FLASK_CORS_EVALUATED = "_FLASK_CORS_EVALUATED"
 
+# The WSGI environ key under which the request's CorsRequest is kept.
+CORS_REQUEST_ENVIRON_KEY = "flask_cors.request"
+
+# The number of distinct Access-Control-Request-Headers values for which the
+# Access-Control-Allow-Headers value is remembered, per policy. Browsers only
+# send a handful of distinct values, so this bounds the memory an attacker
+# sending arbitrary values could make us use, while the least recently used
+# values make room for new ones.
+ALLOW_HEADERS_MEMO_SIZE = 256
+
 # Strange, but this gets the type of a compiled regex, which is otherwise not
 # exposed in a public API.
 RegexObject = type(re.compile(""))
+
+# Characters which are not allowed in header values, as in Werkzeug.
+_NEWLINE_REGEX = re.compile(r"[\r\n]")
+
 DEFAULT_OPTIONS = dict(
     origins="*",
     methods=ALL_METHODS,
@@ -60,6 +87,15 @@ DEFAULT_OPTIONS = dict(
     intercept_exceptions=True,
     always_send=True,
     allow_private_network=False,
+    header_cache_size=None,
+    intercept_preflight=False,
+    preflight_cache_size=None,
+    reject_preflight_status=None,
+    skip_same_origin=False,
+    trust_fetch_metadata=False,
+    exclude_paths=None,
+    exclude_endpoints=None,
+    route_methods=False,
 )
 
 
@@ -111,132 +147,657 @@ def get_regexp_pattern(regexp):
         return str(regexp)
 
 
+class PatternMatcher:
+    """
+    Matches values against a list of literal strings and regular expressions,
+    exactly as `try_match_any_pattern` would, but compiled up front: literals
+    are looked up in a (casefolded) set, and the regular expressions are
+    joined into a single alternation which is only tried when the set lookup
+    misses. The cost of a match therefore does not grow with the number of
+    literal patterns.
+
+    `match_all` is True if one of the patterns is the wildcard regex `.*`, in
+    which case every value matches without any matching being done.
+    """
+
+    __slots__ = ("caseSensitive", "literals", "match_all", "regex", "regexes")
+
+    def __init__(self, patterns, caseSensitive=True):
+        literals = set()
+        regexes = []
+        for pattern in patterns:
+            if isinstance(pattern, RegexObject):
+                regexes.append(pattern)
+            elif isinstance(pattern, str) and probably_regex(pattern):
+                try:
+                    regexes.append(re.compile(pattern, 0 if caseSensitive else re.IGNORECASE))
+                except re.error:
+                    # An invalid regular expression never matches anything.
+                    LOG.warning("Ignoring invalid regular expression in Flask-CORS options: %r", pattern)
+            else:
+                literals.add(str(pattern) if caseSensitive else str(pattern).casefold())
+
+        self.caseSensitive = caseSensitive
+        self.match_all = any(get_regexp_pattern(regex) == r".*" for regex in regexes)
+        self.literals = frozenset(literals)
+        self.regexes = tuple(regexes)
+        self.regex = combine_patterns(self.regexes)
+
+    def match(self, value):
+        if self.match_all:
+            return True
+        if (value if self.caseSensitive else value.casefold()) in self.literals:
+            return True
+        if self.regex is not None:
+            return self.regex.match(value) is not None
+        # Fall back to trying each regex in turn, if they could not be combined.
+        return any(regex.match(value) for regex in self.regexes)
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class LRUCache:
+    """
+    A thread-safe mapping holding at most `maxsize` entries, which evicts the
+    least recently used entry to make room for a new one. `info` reports the
+    number of hits, misses and evictions so far, in the style of
+    `functools.lru_cache`.
+    """
+
+    __slots__ = ("_data", "_lock", "evictions", "hits", "maxsize", "misses")
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("The maximum size of a cache must be at least 1.")
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CorsPolicy:
+    """
+    The compiled form of a serialized options dictionary, as returned by
+    `get_cors_options`. Everything which does not depend on the request, such
+    as origin and header matchers, the set of allowed methods and the joined
+    header values, is resolved once when the extension or the decorator is
+    configured, so that evaluating a request only needs to read attributes.
+
+    Policies are immutable; build a new one to change the options.
+
+    If a `header_cache` is given, or the `header_cache_size` option is set,
+    the headers computed for each distinct set of request inputs are kept in
+    that `LRUCache`. Entries are keyed by the policy itself, so a single cache
+    may be shared between policies.
+    """
+
+    __slots__ = (
+        "allow_headers",
+        "allow_headers_memo",
+        "allow_private_network",
+        "always_send",
+        "always_send_origins",
+        "automatic_options",
+        "constant_headers",
+        "constant_origin",
+        "constant_preflight_headers",
+        "expose_headers",
+        "header_cache",
+        "max_age",
+        "methods",
+        "methods_header",
+        "no_origin_headers",
+        "options",
+        "origin_matcher",
+        "origins",
+        "reject_preflight_status",
+        "route_methods",
+        "route_policies",
+        "send_wildcard",
+        "skip_same_origin",
+        "supports_credentials",
+        "trust_fetch_metadata",
+        "vary",
+        "wildcard",
+    )
+
+    def __init__(self, options, header_cache=None):
+        options = dict(options)
+        get = lambda key: options.get(key, DEFAULT_OPTIONS.get(key))
+        origins = tuple(dict.fromkeys(ensure_iterable(get("origins"))))
+        literal_origins = [o for o in origins if isinstance(o, str) and not probably_regex(o)]
+        methods = flexible_str(get("methods"))
+
+        _set = super().__setattr__
+        _set("options", options)
+        if header_cache is None and get("header_cache_size"):
+            header_cache = LRUCache(int(get("header_cache_size")))
+        _set("header_cache", header_cache)
+        _set("origins", origins)
+        _set("origin_matcher", PatternMatcher(origins, caseSensitive=False))
+        _set("wildcard", r".*" in origins)
+        _set("send_wildcard", bool(get("send_wildcard")))
+        _set("always_send", bool(get("always_send")))
+        _set("always_send_origins", sorted(literal_origins))
+        _set("supports_credentials", bool(get("supports_credentials")))
+        _set("allow_private_network", bool(get("allow_private_network")))
+        _set("automatic_options", bool(get("automatic_options")))
+        _set("skip_same_origin", bool(get("skip_same_origin")))
+        _set("trust_fetch_metadata", bool(get("trust_fetch_metadata")))
+        _set("allow_headers", PatternMatcher(ensure_iterable(get("allow_headers")), caseSensitive=False))
+        _set("allow_headers_memo", LRUCache(ALLOW_HEADERS_MEMO_SIZE))
+        _set("expose_headers", flexible_str(get("expose_headers")) or None)
+        _set("max_age", flexible_str(get("max_age")) if get("max_age") else None)
+        _set("methods", frozenset(m.strip().upper() for m in (methods or "").split(",")) - {""})
+        _set("methods_header", methods or None)
+        _set("reject_preflight_status", int(get("reject_preflight_status")) if get("reject_preflight_status") else None)
+        _set("route_methods", bool(get("route_methods")))
+        # The policies restricted to each distinct set of methods allowed by
+        # a route, see get_route_policy.
+        _set("route_policies", {})
+        # Only vary if the origin returned will vary dynamically, i.e. if
+        # there are multiple origins that can be matched. Whether an asterisk
+        # is returned instead is known per request.
+        _set("vary", bool(get("vary_header")) and (len(literal_origins) != len(origins) or len(origins) > 1))
+        # The headers of requests without an Origin, e.g. health checks, only
+        # depend on the policy (and always_send).
+        _set("no_origin_headers", _compute_cors_header_list(self, None, False, None, None, False))
+        # If a wildcard is sent, or only a single literal origin is allowed,
+        # the headers of requests from an allowed origin do not depend on
+        # which origin it is, apart from the Access-Control-Allow-Headers of
+        # preflights. These are compiled once, split around that header.
+        if self.wildcard and self.send_wildcard:
+            constant_origin = "*"
+        elif len(origins) == 1 and literal_origins:
+            constant_origin = literal_origins[0]
+        else:
+            constant_origin = None
+        _set("constant_origin", constant_origin)
+        _set("constant_headers", None)
+        _set("constant_preflight_headers", None)
+        if constant_origin is not None:
+            simple = _compute_cors_header_list(self, constant_origin, False, None, None, False)
+            preflight = simple
+            if self.methods:
+                preflight = _compute_cors_header_list(self, constant_origin, True, min(self.methods), None, False)
+            split = len([name for name, _ in simple if name != "Vary"])
+            _set("constant_headers", simple)
+            _set("constant_preflight_headers", (preflight[:split], preflight[split:]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.options!r})"
+
+
+def ensure_policy(options):
+    """
+    Returns `options` if it is already a `CorsPolicy`, otherwise compiles the
+    given options dictionary into one.
+    """
+    return options if isinstance(options, CorsPolicy) else CorsPolicy(options)
+
+
+class CorsRequest:
+    """
+    The inputs of a request which CORS decisions depend on, read from its WSGI
+    environ in one pass. Use `get_cors_request` to get the one of the current
+    request.
+    """
+
+    __slots__ = (
+        "acl_request_headers",
+        "acl_request_method",
+        "acl_request_private_network",
+        "decision",
+        "host",
+        "method",
+        "origin",
+        "path",
+        "scheme",
+        "sec_fetch_mode",
+        "sec_fetch_site",
+    )
+
+    def __init__(self, environ):
+        get = environ.get
+        self.method = get("REQUEST_METHOD", "GET").upper()
+        # As request.path: WSGI servers decode the path as latin-1.
+        path = get("PATH_INFO") or ""
+        if not path.isascii():
+            path = path.encode("latin1").decode(errors="replace")
+        self.path = "/" + path.lstrip("/")
+        self.origin = get("HTTP_ORIGIN")
+        self.acl_request_method = get("HTTP_ACCESS_CONTROL_REQUEST_METHOD")
+        self.acl_request_headers = get("HTTP_ACCESS_CONTROL_REQUEST_HEADERS")
+        self.acl_request_private_network = get("HTTP_ACCESS_CONTROL_REQUEST_PRIVATE_NETWORK") == "true"
+        self.scheme = get("wsgi.url_scheme", "http")
+        self.host = get("HTTP_HOST")
+        self.sec_fetch_site = get("HTTP_SEC_FETCH_SITE")
+        self.sec_fetch_mode = get("HTTP_SEC_FETCH_MODE")
+        # The CorsDecision made for the request, once it is made.
+        self.decision = None
+
+    @property
+    def preflight(self):
+        return self.method == "OPTIONS" and self.acl_request_method is not None
+
+    @property
+    def same_origin(self):
+        """Whether the Origin is the request's own scheme and host."""
+        origin = self.origin
+        if not origin or not self.host:
+            return False
+        return origin.lower() == f"{self.scheme}://{self.host}".lower()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.method} {self.path} origin={self.origin!r}>"
+
+
+def get_cors_request():
+    """
+    Returns the CorsRequest of the current request. It is read from the
+    environ the first time it is needed, and kept there for the rest of the
+    request.
+    """
+    environ = request.environ
+    try:
+        return environ[CORS_REQUEST_ENVIRON_KEY]
+    except KeyError:
+        cors_request = environ[CORS_REQUEST_ENVIRON_KEY] = CorsRequest(environ)
+        return cors_request
+
+
+def is_same_origin_request(options, cors_request):
+    """
+    Returns whether CORS should be skipped for a request because it is
+    same-origin, according to the policy's `skip_same_origin` and
+    `trust_fetch_metadata` options. Skipping only ever withholds CORS
+    headers, so it is safe even though clients may forge these headers.
+    """
+    policy = ensure_policy(options)
+    if policy.trust_fetch_metadata and (
+        cors_request.sec_fetch_site == "same-origin" or cors_request.sec_fetch_mode == "navigate"
+    ):
+        return True
+    return policy.skip_same_origin and cors_request.same_origin
+
+
+def get_route_policy(options):
+    """
+    Returns the policy to apply to the current request. If the policy's
+    `route_methods` option is set and the request was routed, this is a
+    policy whose methods are restricted to those allowed for the request's
+    URL, compiled once for each distinct set of allowed methods.
+    """
+    policy = ensure_policy(options)
+    if not policy.route_methods or request.url_rule is None:
+        return policy
+
+    allowed_methods = get_allowed_methods()
+    route_policy = policy.route_policies.get(allowed_methods)
+    if route_policy is None:
+        route_options = dict(policy.options, methods=sorted(policy.methods & allowed_methods), route_methods=False)
+        route_policy = CorsPolicy(route_options, header_cache=policy.header_cache)
+        policy.route_policies[allowed_methods] = route_policy
+    return route_policy
+
+
 def get_cors_origins(options, request_origin):
-    origins = options.get("origins")
-    wildcard = r".*" in origins
+    policy = ensure_policy(options)
 
     # If the Origin header is not present terminate this set of steps.
     # The request is outside the scope of this specification.-- W3Spec
     if request_origin:
-        LOG.debug("CORS request received with 'Origin' %s", request_origin)
-
         # If the allowed origins is an asterisk or 'wildcard', always match
-        if wildcard and options.get("send_wildcard"):
-            LOG.debug("Allowed origins are set to '*'. Sending wildcard CORS header.")
+        if policy.wildcard and policy.send_wildcard:
             return ["*"]
         # If the value of the Origin header is a case-insensitive match
         # for any of the values in list of origins.
         # NOTE: Per RFC 1035 and RFC 4343 schemes and hostnames are case insensitive.
-        elif try_match_any_pattern(request_origin, origins, caseSensitive=False):
-            LOG.debug(
-                "The request's Origin header matches. Sending CORS headers.",
-            )
+        elif policy.origin_matcher.match(request_origin):
             # Add a single Access-Control-Allow-Origin header, with either
             # the value of the Origin header or the string "*" as value.
             # -- W3Spec
             return [request_origin]
         else:
-            LOG.debug("The request's Origin header does not match any of allowed origins.")
             return None
 
-    elif options.get("always_send"):
-        if wildcard:
+    elif policy.always_send:
+        if policy.wildcard:
             # If wildcard is in the origins, even if 'send_wildcard' is False,
             # simply send the wildcard. Unless supports_credentials is True,
             # since that is forbidden by the spec..
             # It is the most-likely to be correct thing to do (the only other
             # option is to return nothing, which  almost certainly not what
             # the developer wants if the '*' origin was specified.
-            if options.get("supports_credentials"):
+            if policy.supports_credentials:
                 return None
             else:
                 return ["*"]
         else:
             # Return all origins that are not regexes.
-            return sorted([o for o in origins if not probably_regex(o)])
+            return list(policy.always_send_origins)
 
     # Terminate these steps, return the original request untouched.
     else:
-        LOG.debug(
-            "The request did not contain an 'Origin' header. This means the browser or client did not request CORS, ensure the Origin Header is set."
-        )
         return None
 
 
 def get_allow_headers(options, acl_request_headers):
     if acl_request_headers:
+        policy = ensure_policy(options)
+        allow_headers = policy.allow_headers_memo.get(acl_request_headers)
+        if allow_headers is not None:
+            return allow_headers
+
         request_headers = [h.strip() for h in acl_request_headers.split(",")]
 
-        # any header that matches in the allow_headers
-        matching_headers = filter(lambda h: try_match_any_pattern(h, options.get("allow_headers"), caseSensitive=False), request_headers)
+        # any header that matches in the allow_headers. With the default of
+        # '*', that is all of them.
+        if policy.allow_headers.match_all:
+            matching_headers = request_headers
+        else:
+            matching_headers = filter(policy.allow_headers.match, request_headers)
 
-        return ", ".join(sorted(matching_headers))
+        allow_headers = ", ".join(sorted(matching_headers))
+        policy.allow_headers_memo.set(acl_request_headers, allow_headers)
+        return allow_headers
 
     return None
 
 
 def get_cors_headers(options, request_headers, request_method):
-    origins_to_set = get_cors_origins(options, request_headers.get("Origin"))
-    headers = MultiDict()
+    policy = ensure_policy(options)
+    return MultiDict(
+        get_cors_header_list(
+            policy,
+            request_headers.get("Origin"),
+            request_method,
+            request_headers.get(ACL_REQUEST_METHOD),
+            request_headers.get(ACL_REQUEST_HEADERS),
+            request_headers.get(ACL_REQUEST_HEADER_PRIVATE_NETWORK) == "true",
+        )
+    )
+
+
+def get_cors_header_list(
+    policy, request_origin, request_method, acl_request_method, acl_request_headers, acl_request_private_network
+):
+    """
+    Returns the CORS headers to set on a response as a tuple of (name, value)
+    pairs. The result only depends on the policy and the given request
+    inputs, so if the policy has a header cache, it is looked up there first.
+    """
+    preflight = request_method == "OPTIONS"
+    if not preflight:
+        # These only affect the headers of preflight requests.
+        acl_request_method = acl_request_headers = None
+
+    if not request_origin:
+        if not acl_request_method and not acl_request_private_network:
+            return policy.no_origin_headers
+    elif policy.constant_origin is not None and not acl_request_private_network:
+        if policy.constant_origin == "*" or request_origin == policy.constant_origin:
+            if not acl_request_method or acl_request_method.upper() not in policy.methods:
+                return policy.constant_headers
+            head, tail = policy.constant_preflight_headers
+            allow_headers = get_allow_headers(policy, acl_request_headers)
+            if not allow_headers:
+                return head + tail
+            _validate_header_values(((ACL_ALLOW_HEADERS, allow_headers),))
+            return head + ((ACL_ALLOW_HEADERS, allow_headers),) + tail
+
+    cache = policy.header_cache
+    if cache is None:
+        return _compute_cors_header_list(
+            policy, request_origin, preflight, acl_request_method, acl_request_headers, acl_request_private_network
+        )
+
+    key = (policy, request_origin, preflight, acl_request_method, acl_request_headers, acl_request_private_network)
+    headers = cache.get(key)
+    if headers is None:
+        headers = _compute_cors_header_list(
+            policy, request_origin, preflight, acl_request_method, acl_request_headers, acl_request_private_network
+        )
+        cache.set(key, headers)
+    return headers
+
+
+def _compute_cors_header_list(
+    policy, request_origin, preflight, acl_request_method, acl_request_headers, acl_request_private_network
+):
+    origins_to_set = get_cors_origins(policy, request_origin)
 
     if not origins_to_set:  # CORS is not enabled for this route
-        return headers
+        return ()
 
-    for origin in origins_to_set:
-        headers.add(ACL_ORIGIN, origin)
+    # Only the first origin is ever sent; multiple values are not allowed.
+    headers = [(ACL_ORIGIN, origins_to_set[0])]
 
-    headers[ACL_EXPOSE_HEADERS] = options.get("expose_headers")
+    if policy.expose_headers:
+        headers.append((ACL_EXPOSE_HEADERS, policy.expose_headers))
 
-    if options.get("supports_credentials"):
-        headers[ACL_CREDENTIALS] = "true"  # case sensitive
+    if policy.supports_credentials:
+        headers.append((ACL_CREDENTIALS, "true"))  # case sensitive
 
-    if (
-        ACL_REQUEST_HEADER_PRIVATE_NETWORK in request_headers
-        and request_headers.get(ACL_REQUEST_HEADER_PRIVATE_NETWORK) == "true"
-    ):
-        allow_private_network = "true" if options.get("allow_private_network") else "false"
-        headers[ACL_RESPONSE_PRIVATE_NETWORK] = allow_private_network
+    if acl_request_private_network:
+        allow_private_network = "true" if policy.allow_private_network else "false"
+        headers.append((ACL_RESPONSE_PRIVATE_NETWORK, allow_private_network))
 
     # This is a preflight request
     # http://www.w3.org/TR/cors/#resource-preflight-requests
-    if request_method == "OPTIONS":
-        acl_request_method = request_headers.get(ACL_REQUEST_METHOD, "").upper()
-
+    if preflight:
         # If there is no Access-Control-Request-Method header or if parsing
         # failed, do not set any additional headers
-        if acl_request_method and acl_request_method in options.get("methods"):
+        if acl_request_method and acl_request_method.upper() in policy.methods:
             # If method is not a case-sensitive match for any of the values in
             # list of methods do not set any additional headers and terminate
             # this set of steps.
-            headers[ACL_ALLOW_HEADERS] = get_allow_headers(options, request_headers.get(ACL_REQUEST_HEADERS))
-            headers[ACL_MAX_AGE] = options.get("max_age")
-            headers[ACL_METHODS] = options.get("methods")
-        else:
-            LOG.info(
-                "The request's Access-Control-Request-Method header does not match allowed methods. CORS headers will not be applied."
-            )
+            allow_headers = get_allow_headers(policy, acl_request_headers)
+            if allow_headers:
+                headers.append((ACL_ALLOW_HEADERS, allow_headers))
+            if policy.max_age:
+                headers.append((ACL_MAX_AGE, policy.max_age))
+            if policy.methods_header:
+                headers.append((ACL_METHODS, policy.methods_header))
 
     # http://www.w3.org/TR/cors/#resource-implementation
-    if options.get("vary_header"):
-        # Only set header if the origin returned will vary dynamically,
-        # i.e. if we are not returning an asterisk, and there are multiple
-        # origins that can be matched.
-        if headers[ACL_ORIGIN] == "*":
-            pass
-        elif (
-            len(options.get("origins")) > 1
-            or len(origins_to_set) > 1
-            or any(map(probably_regex, options.get("origins")))
-        ):
-            headers.add("Vary", "Origin")
+    if policy.vary and origins_to_set[0] != "*":
+        headers.append(("Vary", "Origin"))
+
+    _validate_header_values(headers)
+    return tuple(headers)
+
 
-    return MultiDict((k, v) for k, v in headers.items() if v)
+def _validate_header_values(headers):
+    # The headers are added to responses without being validated again, see
+    # add_cors_headers, so values echoed from the request are checked here.
+    for _, value in headers:
+        if _NEWLINE_REGEX.search(value) is not None:
+            raise ValueError("Header values must not contain newline characters.")
 
 
-def set_cors_headers(resp, options):
+def add_cors_headers(resp_headers, headers):
+    """
+    Adds the (name, value) pairs returned by `get_cors_header_list` to a
+    response's headers. Their values are already validated strings, so for
+    Werkzeug's `Headers` they are appended to its list in one step, instead
+    of one `add` at a time.
+    """
+    if type(resp_headers) is Headers:
+        resp_headers._list.extend(headers)
+    else:
+        for k, v in headers:
+            resp_headers.add(k, v)
+
+
+class CorsDecision:
+    """
+    The outcome of evaluating CORS for a request:
+
+    - `resource`: the pattern of the matched resource, if known.
+    - `policy`: the CorsPolicy which was applied, if any.
+    - `origin`: the request's `Origin`.
+    - `allowed_origin`: the `Access-Control-Allow-Origin` value, or None if
+      the request is not allowed.
+    - `preflight`: whether the request is a preflight.
+    - `headers`: the CORS headers as a tuple of (name, value) pairs.
+    - `outcome`: e.g. "allowed", "origin not allowed" or "method not allowed".
+
+    Decisions are made once per request and policy, and kept on its
+    CorsRequest; use `current_decision` to get the one of the current
+    request.
+    """
+
+    __slots__ = ("allowed_origin", "headers", "origin", "outcome", "policy", "preflight", "resource")
+
+    def __init__(self, cors_request, policy, headers, resource=None, outcome=None):
+        self.resource = resource if resource is None else get_regexp_pattern(resource)
+        self.policy = policy
+        self.origin = cors_request.origin
+        self.preflight = cors_request.preflight
+        self.headers = headers
+        # The allowed origin, if any, is always the first header.
+        self.allowed_origin = headers[0][1] if headers and headers[0][0] == ACL_ORIGIN else None
+        if outcome is None:
+            if self.allowed_origin is None:
+                outcome = "origin not allowed" if cors_request.origin else "no origin"
+            elif self.preflight and all(name != ACL_METHODS for name, _ in headers):
+                outcome = "method not allowed"
+            else:
+                outcome = "allowed"
+        self.outcome = outcome
+
+    @property
+    def allowed(self):
+        return self.allowed_origin is not None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.outcome} origin={self.origin!r} resource={self.resource!r}>"
+
+
+def get_cors_decision(options, resource=None):
+    """
+    Returns the CorsDecision for the current request under the given policy,
+    making it only if it was not already made with that policy during this
+    request.
+    """
+    policy = ensure_policy(options)
+    cors_request = get_cors_request()
+    decision = cors_request.decision
+    if decision is not None and decision.policy is policy:
+        return decision
+
+    if (policy.skip_same_origin or policy.trust_fetch_metadata) and is_same_origin_request(policy, cors_request):
+        decision = CorsDecision(cors_request, policy, (), resource, "same origin")
+    else:
+        # Only the headers of preflights depend on the allowed methods.
+        headers = get_cors_header_list(
+            get_route_policy(policy) if policy.route_methods and cors_request.preflight else policy,
+            cors_request.origin,
+            cors_request.method,
+            cors_request.acl_request_method,
+            cors_request.acl_request_headers,
+            cors_request.acl_request_private_network,
+        )
+        decision = CorsDecision(cors_request, policy, headers, resource)
+    cors_request.decision = decision
+    return decision
+
+
+def current_decision():
+    """
+    Returns the CorsDecision for the current request, e.g. to reuse its
+    origin check in application code. If it has not been made yet, it is made
+    with the policy of the matching resource of the CORS extension on the
+    current application, and reused when the response's headers are set.
+    Returns None if the request is excluded from CORS, or if the extension is
+    not initialized on the application (e.g. only on a blueprint) and no
+    decorated view has been evaluated.
+    """
+    cors_request = get_cors_request()
+    if cors_request.decision is None:
+        state = getattr(current_app, "extensions", {}).get("cors")
+        if state is not None:
+            state.decide(cors_request)
+    return cors_request.decision
+
+
+def log_cors_decision(headers, resource=None, decision=None):
+    """
+    Logs a single, structured record of the CORS decision made for the
+    current request: the request's inputs, the matched resource (if known),
+    the outcome and the headers which were set. The record is also attached
+    to the log record as its `cors` attribute.
+
+    This is called once per request, and does nothing beyond checking the
+    log level unless debug logging is enabled for flask_cors.
+    """
+    if not LOG.isEnabledFor(logging.DEBUG):
+        return
+
+    cors_request = get_cors_request()
+    if decision is None:
+        decision = CorsDecision(cors_request, None, headers).outcome
+
+    record = {
+        "path": cors_request.path,
+        "method": cors_request.method,
+        "origin": cors_request.origin,
+        "preflight": cors_request.preflight,
+        "request_method": cors_request.acl_request_method,
+        "request_headers": cors_request.acl_request_headers,
+        "resource": resource if resource is None else get_regexp_pattern(resource),
+        "decision": decision,
+        "headers": dict(headers),
+    }
+    # The record's values are formatted with repr, so that request headers
+    # can not be used to inject arbitrary content into the log.
+    LOG.debug("CORS decision: %s", record, extra={"cors": record})
+
+
+def set_cors_headers(resp, options, resource=None):
     """
     Performs the actual evaluation of Flask-CORS options and actually
-    modifies the response object.
+    modifies the response object. `options` is preferably a `CorsPolicy`,
+    compiled once when CORS is configured. `resource` is the pattern of the
+    matched resource, if any, which is only logged.
 
     This function is used both in the decorator and the after_request
     callback
@@ -244,7 +805,6 @@ def set_cors_headers(resp, options):
 
     # If CORS has already been evaluated via the decorator, skip
     if hasattr(resp, FLASK_CORS_EVALUATED):
-        LOG.debug("CORS have been already evaluated, skipping")
         return resp
 
     # Some libraries, like OAuthlib, set resp.headers to non Multidict
@@ -253,12 +813,9 @@ def set_cors_headers(resp, options):
     if not isinstance(resp.headers, Headers) and not isinstance(resp.headers, MultiDict):
         resp.headers = MultiDict(resp.headers)
 
-    headers_to_set = get_cors_headers(options, request.headers, request.method)
-
-    LOG.debug("Settings CORS headers: %s", str(headers_to_set))
-
-    for k, v in headers_to_set.items():
-        resp.headers.add(k, v)
+    decision = get_cors_decision(options, resource)
+    log_cors_decision(decision.headers, resource, decision.outcome)
+    add_cors_headers(resp.headers, decision.headers)
 
     return resp
 
@@ -273,6 +830,39 @@ def probably_regex(maybe_regex):
         return any(c in maybe_regex for c in common_regex_chars)
 
 
+# Regular expressions whose meaning could change when embedded in a larger
+# pattern: global inline flags, and references to numbered groups.
+_UNCOMBINABLE_REGEX = re.compile(r"\(\?[aiLmsux]+\)|\\[1-9]|\(\?\(|\(\?P=")
+_SCOPED_FLAGS = ((re.ASCII, "a"), (re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+
+def combine_patterns(regexes, group_names=None):
+    """
+    Joins compiled regular expressions into a single compiled alternation.
+    Alternatives are tried in order, so `match` succeeds wherever any one of
+    the regular expressions would, and if `group_names` are given, the
+    `lastgroup` of the match names the first of them which matched.
+
+    Returns None if there are no regular expressions, or if they cannot be
+    combined without changing the meaning of any of them.
+    """
+    if not regexes:
+        return None
+
+    parts = []
+    for i, regex in enumerate(regexes):
+        if not isinstance(regex.pattern, str) or regex.flags & re.VERBOSE or _UNCOMBINABLE_REGEX.search(regex.pattern):
+            return None
+        flags = "".join(letter for flag, letter in _SCOPED_FLAGS if regex.flags & flag)
+        part = f"(?{flags}:{regex.pattern})" if flags else f"(?:{regex.pattern})"
+        parts.append(f"(?P<{group_names[i]}>{part})" if group_names else part)
+
+    try:
+        return re.compile("|".join(parts))
+    except re.error:
+        return None
+
+
 def re_fix(reg):
     """
     Replace the invalid regex r'*' with the valid, wildcard regex r'/.*' to
@@ -332,6 +922,74 @@ def get_app_kwarg_dict(appInstance=None):
     return {k.lower().replace("cors_", ""): app_config.get(k) for k in CONFIG_OPTIONS if app_config.get(k) is not None}
 
 
+def get_app_config_snapshot(appInstance):
+    """
+    Returns the values of the app's CORS_* configuration, along with shallow
+    copies of the lists, sets and dictionaries among them, so that
+    `app_config_changed` can cheaply detect changes to the configuration.
+    """
+    values = _get_app_config_values(appInstance)
+    return values, tuple((value, copy(value)) for value in values if isinstance(value, (list, set, dict)))
+
+
+def app_config_changed(appInstance, snapshot):
+    """
+    Returns whether the app's CORS_* configuration changed since the snapshot
+    was taken, i.e. whether a value was set, removed or replaced, or whether
+    one of its lists, sets or dictionaries was changed in place. Values nested
+    in those are not compared, e.g. the options of a resource in
+    `CORS_RESOURCES` which are changed in place.
+    """
+    values, copies = snapshot
+    return _get_app_config_values(appInstance) != values or any(value != copied for value, copied in copies)
+
+
+def _get_app_config_values(appInstance):
+    return tuple(map(getattr(appInstance, "config", {}).get, CONFIG_OPTIONS))
+
+
+# The methods allowed for requests routed to each static URL rule, per app.
+_allowed_methods = WeakKeyDictionary()
+
+
+def get_allowed_methods():
+    """
+    Returns the methods allowed for the URL of the current request, as listed
+    in the `Allow` header of the app's default OPTIONS response, as a
+    frozenset. Finding them tries every rule in the URL map, so for requests
+    routed to a static URL rule, i.e. one without any variable parts, they
+    are only found once per rule.
+    """
+    app = current_app._get_current_object()
+    url_rule = request.url_rule
+    if url_rule is None or url_rule.arguments:
+        return frozenset(app.make_default_options_response().allow)
+
+    rule_methods = _allowed_methods.get(app)
+    if rule_methods is None:
+        rule_methods = _allowed_methods.setdefault(app, {})
+    key = (url_rule.rule, url_rule.subdomain, getattr(url_rule, "host", None))
+    try:
+        return rule_methods[key]
+    except KeyError:
+        methods = rule_methods[key] = frozenset(app.make_default_options_response().allow)
+        return methods
+
+
+def make_default_options_response():
+    """
+    Returns the current app's default OPTIONS response, as
+    `app.make_default_options_response` does, but with the allowed methods
+    from `get_allowed_methods`, unless the app overrides that method.
+    """
+    app = current_app._get_current_object()
+    if type(app).make_default_options_response is not Flask.make_default_options_response:
+        return app.make_default_options_response()
+    resp = app.response_class()
+    resp.allow.update(sorted(get_allowed_methods()))
+    return resp
+
+
 def flexible_str(obj):
     """
     A more flexible str function which intelligently handles stringifying
@@ -1,9 +1,21 @@
 import logging
 from functools import update_wrapper
-
-from flask import current_app, make_response, request
-
-from .core import FLASK_CORS_EVALUATED, get_cors_options, set_cors_headers
+from weakref import WeakKeyDictionary
+
+from flask import current_app, make_response
+
+from .core import (
+    FLASK_CORS_EVALUATED,
+    CorsPolicy,
+    LRUCache,
+    app_config_changed,
+    get_app_config_snapshot,
+    get_cors_decision,
+    get_cors_options,
+    get_cors_request,
+    make_default_options_response,
+    set_cors_headers,
+)
 
 LOG = logging.getLogger(__name__)
 
@@ -93,6 +105,44 @@ def cross_origin(*args, **kwargs):
         Default : True
     :type automatic_options: bool
 
+    :param header_cache_size:
+        If set, the CORS headers computed for each distinct combination of
+        `Origin`, request method, `Access-Control-Request-Method`,
+        `Access-Control-Request-Headers` and
+        `Access-Control-Request-Private-Network` are kept in a cache holding
+        at most this many entries, evicting the least recently used entry
+        when it is full. The cache is available as the `header_cache`
+        attribute of the decorated function, whose `info()` method reports
+        hits, misses and evictions.
+
+        Default : None
+    :type header_cache_size: int or None
+
+    :param skip_same_origin:
+        If True, CORS headers are not added to responses to requests whose
+        `Origin` is the request's own scheme and host, i.e. same-origin
+        requests, which browsers do not need CORS headers for.
+
+        Default : False
+    :type skip_same_origin: bool
+
+    :param trust_fetch_metadata:
+        If True, CORS headers are not added to responses to requests which
+        carry `Sec-Fetch-Site: same-origin` or `Sec-Fetch-Mode: navigate`,
+        whether or not they have an `Origin` header.
+
+        Default : False
+    :type trust_fetch_metadata: bool
+
+    :param route_methods:
+        If True, the methods allowed in response to preflights are restricted
+        to those which the requested URL's routes accept, so that browsers
+        fail fast on methods which are not supported. The methods are found
+        once per URL rule, unless it has variable parts.
+
+        Default : False
+    :type route_methods: bool
+
     """
     _options = kwargs
 
@@ -111,12 +161,31 @@ def cross_origin(*args, **kwargs):
             f.required_methods.add("OPTIONS")
             f.provide_automatic_options = False
 
+        # The options are compiled once per application serving this view,
+        # and only recompiled if that application's CORS_* configuration
+        # changes.
+        policies = WeakKeyDictionary()
+
+        def get_policy(app):
+            cached = policies.get(app)
+            if cached is None or app_config_changed(app, cached[0]):
+                options = get_cors_options(app, _options)
+                # The header cache is shared by the policies of all apps.
+                if wrapped_function.header_cache is None and options.get("header_cache_size"):
+                    wrapped_function.header_cache = LRUCache(int(options["header_cache_size"]))
+                cached = (get_app_config_snapshot(app), CorsPolicy(options, header_cache=wrapped_function.header_cache))
+                policies[app] = cached
+            return cached[1]
+
         def wrapped_function(*args, **kwargs):
             # Handle setting of Flask-Cors parameters
-            options = get_cors_options(current_app, _options)
+            options = get_policy(current_app._get_current_object())
+            # Decide before the view runs, so current_decision() in the view
+            # returns this decision rather than the extension's.
+            get_cors_decision(options)
 
-            if options.get("automatic_options") and request.method == "OPTIONS":
-                resp = current_app.make_default_options_response()
+            if options.automatic_options and get_cors_request().method == "OPTIONS":
+                resp = make_default_options_response()
             else:
                 resp = make_response(f(*args, **kwargs))
 
@@ -124,6 +193,8 @@ def cross_origin(*args, **kwargs):
             setattr(resp, FLASK_CORS_EVALUATED, True)
             return resp
 
-        return update_wrapper(wrapped_function, f)
+        update_wrapper(wrapped_function, f)
+        wrapped_function.header_cache = None
+        return wrapped_function
 
     return decorator
@@ -1,12 +1,39 @@
 import logging
+import re
 from urllib.parse import unquote
 
-from flask import request
-
-from .core import ACL_ORIGIN, get_cors_options, get_regexp_pattern, parse_resources, set_cors_headers, try_match_pattern
+from flask import current_app, request
+
+from .core import (
+    ACL_ORIGIN,
+    FLASK_CORS_EVALUATED,
+    CorsDecision,
+    CorsPolicy,
+    LRUCache,
+    RegexObject,
+    combine_patterns,
+    ensure_iterable,
+    get_cors_decision,
+    get_cors_header_list,
+    get_cors_options,
+    get_cors_origins,
+    get_cors_request,
+    get_regexp_pattern,
+    get_route_policy,
+    is_same_origin_request,
+    log_cors_decision,
+    parse_resources,
+    probably_regex,
+    set_cors_headers,
+)
 
 LOG = logging.getLogger(__name__)
 
+# Attribute added to responses by the after_request function which evaluated
+# them, as both a wrapped exception handler and the after_request hook may
+# see the same response.
+FLASK_CORS_EVALUATED_BY = "_FLASK_CORS_EVALUATED_BY"
+
 
 class CORS:
     """
@@ -49,6 +76,20 @@ class CORS:
 
     :type resources: dict, iterable or string
 
+    :param exclude_paths:
+        Exact request paths, e.g. `/healthz`, for which CORS is skipped
+        entirely, regardless of `resources`. Checked before anything else, so
+        requests to these paths cost a single set lookup.
+
+        Default : None
+    :type exclude_paths: list or string
+
+    :param exclude_endpoints:
+        As `exclude_paths`, but names of endpoints, e.g. `metrics`.
+
+        Default : None
+    :type exclude_endpoints: list or string
+
     :param origins:
         The origin, or list of origins to allow requests from.
         The origin(s) may be regular expressions, case-sensitive strings,
@@ -138,10 +179,87 @@ class CORS:
 
         Default : True
     :type allow_private_network: bool
+
+    :param header_cache_size:
+        If set, the CORS headers computed for each distinct combination of
+        resource, `Origin`, request method, `Access-Control-Request-Method`,
+        `Access-Control-Request-Headers` and
+        `Access-Control-Request-Private-Network` are kept in a cache holding
+        at most this many entries, evicting the least recently used entry
+        when it is full. The cache is available as the `header_cache`
+        attribute, whose `info()` method reports hits, misses and evictions.
+
+        Default : None
+    :type header_cache_size: int or None
+
+    :param intercept_preflight:
+        If True, valid preflight requests, i.e. OPTIONS requests with an
+        allowed `Origin` and `Access-Control-Request-Method`, to routes
+        relying on Flask's automatic OPTIONS handling are answered with an
+        empty 204 response carrying the CORS headers from a `before_request`
+        handler which runs before any other. The view is not dispatched, and
+        no other `before_request` handlers are run. Invalid preflights are
+        handled as usual.
+
+        Default : False
+    :type intercept_preflight: bool
+
+    :param preflight_cache_size:
+        Only applies if `intercept_preflight` is True. If set, the CORS
+        headers of the responses to valid preflights are kept in a cache
+        holding at most this many entries, keyed by resource, `Origin`,
+        `Access-Control-Request-Method`, the set of
+        `Access-Control-Request-Headers` and
+        `Access-Control-Request-Private-Network`, so that repeated preflights
+        are answered without computing them again. The cache is available as
+        the `preflight_cache` attribute, and is flushed whenever `init_app`
+        compiles new options.
+
+        Default : None
+    :type preflight_cache_size: int or None
+
+    :param reject_preflight_status:
+        If set, preflight requests whose `Origin` or
+        `Access-Control-Request-Method` is not allowed, to routes relying on
+        Flask's automatic OPTIONS handling, are answered with an empty
+        response with this status, e.g. 403, from a `before_request` handler
+        which runs before any other, instead of Flask's default OPTIONS
+        response without CORS headers. May be set per resource. Does not
+        apply to the `cross_origin` decorator.
+
+        Default : None
+    :type reject_preflight_status: int or None
+
+    :param skip_same_origin:
+        If True, CORS headers are not added to responses to requests whose
+        `Origin` is the request's own scheme and host, i.e. same-origin
+        requests, which browsers do not need CORS headers for.
+
+        Default : False
+    :type skip_same_origin: bool
+
+    :param trust_fetch_metadata:
+        If True, CORS headers are not added to responses to requests which
+        carry `Sec-Fetch-Site: same-origin` or `Sec-Fetch-Mode: navigate`,
+        whether or not they have an `Origin` header.
+
+        Default : False
+    :type trust_fetch_metadata: bool
+
+    :param route_methods:
+        If True, the methods allowed in response to preflights are restricted
+        to those which the requested URL's routes accept, so that browsers
+        fail fast on methods which are not supported. The methods are found
+        once per URL rule, unless it has variable parts.
+
+        Default : False
+    :type route_methods: bool
     """
 
     def __init__(self, app=None, **kwargs):
         self._options = kwargs
+        self.header_cache = None
+        self.preflight_cache = None
         if app is not None:
             self.init_app(app, **kwargs)
 
@@ -150,22 +268,58 @@ class CORS:
         # or the kwargs to the call to init_app.
         options = get_cors_options(app, self._options, kwargs)
 
+        # A single header cache is shared by all resources and applications;
+        # its entries are keyed by the policy they were computed for.
+        if self.header_cache is None and options.get("header_cache_size"):
+            self.header_cache = LRUCache(int(options["header_cache_size"]))
+
         # Flatten our resources into a list of the form
         # (pattern_or_regexp, dictionary_of_options)
         resources = parse_resources(options.get("resources"))
 
         # Compute the options for each resource by combining the options from
         # the app's configuration, the constructor, the kwargs to init_app, and
-        # finally the options specified in the resources dictionary.
-        resources = [(pattern, get_cors_options(app, options, opts)) for (pattern, opts) in resources]
+        # finally the options specified in the resources dictionary. Each set of
+        # options is compiled into a CorsPolicy once, here, rather than on every
+        # request.
+        resources = [
+            (pattern, CorsPolicy(get_cors_options(app, options, opts), header_cache=self.header_cache))
+            for (pattern, opts) in resources
+        ]
 
         # Create a human-readable form of these resources by converting the compiled
         # regular expressions into strings.
-        resources_human = {get_regexp_pattern(pattern): opts for (pattern, opts) in resources}
+        resources_human = {get_regexp_pattern(pattern): policy.options for (pattern, policy) in resources}
         LOG.debug("Configuring CORS with resources: %s", resources_human)
 
-        cors_after_request = make_after_request_function(resources)
+        find_resource = make_resource_lookup(resources)
+        is_excluded = make_exclusion_check(options.get("exclude_paths"), options.get("exclude_endpoints"))
+
+        decide = make_decision_function(find_resource, is_excluded)
+        cors_after_request = make_after_request_function(decide, is_excluded)
         app.after_request(cors_after_request)
+        # Used by current_decision. If CORS is initialized more than once for
+        # an app, the last after_request function runs first, and its headers
+        # are the ones sent, so its decision is the one exposed. Blueprints
+        # have no extensions.
+        if hasattr(app, "extensions"):
+            app.extensions["cors"] = CorsState(self, decide)
+
+        # Answer or reject preflights before any other before_request handler
+        # runs.
+        reject_preflights = any(policy.reject_preflight_status is not None for _, policy in resources)
+        if options.get("intercept_preflight") or reject_preflights:
+            # Cached preflight responses are only valid for the policies they
+            # were computed with, so flush them whenever those are rebuilt.
+            if self.preflight_cache is not None:
+                self.preflight_cache.clear()
+            elif options.get("preflight_cache_size"):
+                self.preflight_cache = LRUCache(int(options["preflight_cache_size"]))
+
+            cors_before_request = make_before_request_function(
+                find_resource, self.preflight_cache, bool(options.get("intercept_preflight")), is_excluded
+            )
+            app.before_request_funcs.setdefault(None, []).insert(0, cors_before_request)
 
         # Wrap exception handlers with cross_origin
         # These error handlers will still respect the behavior of the route
@@ -182,25 +336,301 @@ class CORS:
                 app.handle_user_exception = _after_request_decorator(app.handle_user_exception)
 
 
-def make_after_request_function(resources):
+class CorsState:
+    """
+    What the CORS extension keeps in `app.extensions["cors"]` for an
+    application: the `CORS` instance, and the function which makes the
+    CorsDecision for a request, as used by `current_decision`.
+    """
+
+    __slots__ = ("decide", "extension")
+
+    def __init__(self, extension, decide):
+        self.extension = extension
+        self.decide = decide
+
+
+def make_resource_lookup(resources):
+    """
+    Returns a function which finds the first of the given resources whose
+    pattern matches a request, as a (pattern, policy) tuple, or None.
+
+    Matching a resource only depends on the request's path, so the result for
+    requests routed to a static URL rule, i.e. one without any variable parts,
+    is remembered, and subsequent requests to it cost a single dictionary
+    lookup. Werkzeug rules are not hashable, and a static rule can only be
+    reached by a single path (or two, if it does not use strict slashes), so
+    the index is keyed by path, and is bounded by the size of the URL map.
+    Requests without a rule (e.g. 404s) or routed to rules with variable parts
+    are matched against the resource patterns.
+    """
+    static_rule_resources = {}
+    literal_paths, regexes, regex_indexes = split_resource_patterns(resources)
+    first_regex_index = regex_indexes[0] if regex_indexes else len(resources)
+    match_regexes = make_regex_matcher(regexes, regex_indexes)
+
+    def match_path(path):
+        normalized_path = unquote(path)
+        index = literal_paths.get(normalized_path)
+        # A literal path only needs to be checked against the regexes if one
+        # of them comes first. With a dictionary of resources, they never do.
+        if index is None or index > first_regex_index:
+            regex_index = match_regexes(normalized_path)
+            if regex_index is not None and (index is None or regex_index < index):
+                index = regex_index
+        return resources[index] if index is not None else None
+
+    def find_resource(path, url_rule):
+        if url_rule is None or url_rule.arguments:
+            return match_path(path)
+        try:
+            return static_rule_resources[path]
+        except KeyError:
+            resource = static_rule_resources[path] = match_path(path)
+            return resource
+
+    return find_resource
+
+
+def split_resource_patterns(resources):
+    """
+    Splits the patterns of the given resources into literal paths, as a
+    dictionary of each path to the index of the first resource with it, and
+    compiled regexes, along with a list of the index of each one's resource.
+    Invalid regexes are left out, as they never match anything.
+    """
+    literal_paths = {}
+    regexes = []
+    regex_indexes = []
+    for index, (res_regex, _) in enumerate(resources):
+        if isinstance(res_regex, RegexObject):
+            regexes.append(res_regex)
+            regex_indexes.append(index)
+        elif probably_regex(res_regex):
+            try:
+                regexes.append(re.compile(res_regex))
+                regex_indexes.append(index)
+            except re.error:
+                pass
+        else:
+            literal_paths.setdefault(str(res_regex), index)
+    return literal_paths, regexes, regex_indexes
+
+
+def make_regex_matcher(regexes, indexes):
+    """
+    Returns a function which returns the index of the first of the regexes
+    matching a path, or None. If possible, the regexes are compiled into a
+    single regex with a named group per index, so a single match finds the
+    first of them which matches.
+    """
+    combined_regex = combine_patterns(regexes, [f"r{index}" for index in indexes])
+    if combined_regex is not None:
+
+        def match_combined_regex(path):
+            match = combined_regex.match(path)
+            return int(match.lastgroup[1:]) if match else None
+
+        return match_combined_regex
+
+    def match_each_regex(path):
+        for regex, index in zip(regexes, indexes):
+            if regex.match(path):
+                return index
+        return None
+
+    return match_each_regex
+
+
+def make_exclusion_check(exclude_paths=None, exclude_endpoints=None):
+    """
+    Returns a function which returns whether CORS is skipped for the request
+    with the given CorsRequest, because its path or endpoint is excluded, or
+    None if nothing is excluded.
+    """
+    paths = frozenset(ensure_iterable(exclude_paths)) - {None}
+    endpoints = frozenset(ensure_iterable(exclude_endpoints)) - {None}
+    if not paths and not endpoints:
+        return None
+
+    def is_excluded(cors_request):
+        if cors_request.path in paths:
+            return True
+        # Only look up the endpoint, which needs the request's URL rule, if
+        # any are excluded.
+        return bool(endpoints) and request.endpoint in endpoints
+
+    return is_excluded
+
+
+def make_before_request_function(find_resource, preflight_cache=None, intercept_preflight=True, is_excluded=None):
+    """
+    Returns a before_request function which answers valid preflights itself,
+    if `intercept_preflight` is True, and rejects invalid ones with the
+    `reject_preflight_status` of their resource's policy, if it has one.
+    """
+
+    def cors_before_request():
+        cors_request = get_cors_request()
+        resource = find_preflight_resource(find_resource, cors_request, is_excluded)
+        if resource is None:
+            return None
+        res_regex, policy = resource
+        if policy.route_methods:
+            policy = get_route_policy(policy)
+
+        acl_request_method = cors_request.acl_request_method.upper()
+        if acl_request_method not in policy.methods:
+            return reject_preflight(res_regex, policy, "method not allowed")
+        if intercept_preflight:
+            return answer_preflight(res_regex, policy, cors_request, acl_request_method, preflight_cache)
+        if policy.reject_preflight_status is None or get_cors_origins(policy, cors_request.origin):
+            return None
+        return reject_preflight(res_regex, policy, "origin not allowed")
+
+    return cors_before_request
+
+
+def find_preflight_resource(find_resource, cors_request, is_excluded=None):
+    """
+    Returns the first resource matching the request with the given
+    CorsRequest, as a (pattern, policy) tuple, if it is a cross-origin
+    preflight which would otherwise be answered by Flask's automatic OPTIONS
+    handling, or None.
+    """
+    if cors_request.method != "OPTIONS" or not cors_request.origin or not cors_request.acl_request_method:
+        return None
+    if is_excluded is not None and is_excluded(cors_request):
+        return None
+
+    # Preflights handled by a view (or by the cross_origin decorator), and
+    # those which fail routing, e.g. 404s, are left alone.
+    url_rule = request.url_rule
+    if url_rule is None or not getattr(url_rule, "provide_automatic_options", False):
+        return None
+
+    resource = find_resource(cors_request.path, url_rule)
+    if resource is None:
+        return None
+    # Same-origin requests are left alone, as in set_cors_headers.
+    policy = resource[1]
+    if (policy.skip_same_origin or policy.trust_fetch_metadata) and is_same_origin_request(policy, cors_request):
+        return None
+    return resource
+
+
+def get_preflight_cache_key(policy, cors_request, acl_request_method):
+    """
+    Returns the key under which the response to a preflight is cached. The
+    requested headers are echoed back sorted, so their order and whitespace
+    do not matter. The origin is echoed back as is.
+    """
+    acl_request_headers = cors_request.acl_request_headers
+    return (
+        policy,
+        cors_request.origin,
+        acl_request_method,
+        tuple(sorted(h.strip() for h in acl_request_headers.split(","))) if acl_request_headers else None,
+        cors_request.acl_request_private_network,
+    )
+
+
+def answer_preflight(res_regex, policy, cors_request, acl_request_method, preflight_cache=None):
+    """
+    Returns the response to a preflight whose method is allowed: an empty 204
+    response with the CORS headers, if its origin is allowed, or else the
+    rejection of `reject_preflight`.
+    """
+    if preflight_cache is not None:
+        key = get_preflight_cache_key(policy, cors_request, acl_request_method)
+        headers_to_set = preflight_cache.get(key)
+        if headers_to_set is not None:
+            log_cors_decision(headers_to_set, res_regex)
+            return make_preflight_response(headers_to_set)
+
+    headers_to_set = get_cors_header_list(
+        policy,
+        cors_request.origin,
+        "OPTIONS",
+        acl_request_method,
+        cors_request.acl_request_headers,
+        cors_request.acl_request_private_network,
+    )
+    if not headers_to_set:
+        return reject_preflight(res_regex, policy, "origin not allowed")
+
+    log_cors_decision(headers_to_set, res_regex)
+    if preflight_cache is not None:
+        preflight_cache.set(key, headers_to_set)
+    return make_preflight_response(headers_to_set)
+
+
+def make_preflight_response(headers):
+    """
+    Returns an empty 204 response to a preflight with the given CORS headers,
+    and without the Content-Type the response class would set by default.
+    """
+    resp = current_app.response_class(status=204, headers=headers)
+    resp.headers.pop("Content-Type", None)
+    setattr(resp, FLASK_CORS_EVALUATED, True)
+    return resp
+
+
+def reject_preflight(res_regex, policy, decision):
+    """
+    Returns an empty response with the `reject_preflight_status` of the
+    policy, or None if it has none, in which case the preflight is left to
+    the usual handling.
+    """
+    if policy.reject_preflight_status is None:
+        return None
+    log_cors_decision((), res_regex, decision)
+    resp = current_app.response_class(status=policy.reject_preflight_status)
+    setattr(resp, FLASK_CORS_EVALUATED, True)
+    return resp
+
+
+def make_decision_function(find_resource, is_excluded=None):
+    """
+    Returns a function which makes the CorsDecision for a CorsRequest with
+    the policy of the first matching resource, unless it was already made
+    with that policy, and returns it, or None if the request is excluded.
+    """
+
+    def decide(cors_request):
+        if is_excluded is not None and is_excluded(cors_request):
+            return None
+        resource = find_resource(cors_request.path, request.url_rule)
+        if resource is None:
+            decision = cors_request.decision = CorsDecision(cors_request, None, (), outcome="no matching resource")
+            return decision
+        res_regex, policy = resource
+        return get_cors_decision(policy, res_regex)
+
+    return decide
+
+
+def make_after_request_function(decide, is_excluded=None):
     def cors_after_request(resp):
+        cors_request = get_cors_request()
+        if is_excluded is not None and is_excluded(cors_request):
+            return resp
         # If CORS headers are set in a view decorator, pass
         if resp.headers is not None and resp.headers.get(ACL_ORIGIN):
-            LOG.debug("CORS have been already evaluated, skipping")
             return resp
-        normalized_path = unquote(request.path)
-        for res_regex, res_options in resources:
-            if try_match_pattern(normalized_path, res_regex, caseSensitive=True):
-                LOG.debug(
-                    "Request to '%r' matches CORS resource '%s'. Using options: %s",
-                    request.path,
-                    get_regexp_pattern(res_regex),
-                    res_options,
-                )
-                set_cors_headers(resp, res_options)
-                break
+        # If CORS was evaluated for the response by the decorator, or it is
+        # a preflight answered (or rejected) by the before_request function,
+        # there is nothing left to decide.
+        if hasattr(resp, FLASK_CORS_EVALUATED):
+            return resp
+        if getattr(resp, FLASK_CORS_EVALUATED_BY, None) is cors_after_request:
+            return resp
+        setattr(resp, FLASK_CORS_EVALUATED_BY, cors_after_request)
+        decision = decide(cors_request)
+        if decision.policy is not None:
+            set_cors_headers(resp, decision.policy, decision.resource)
         else:
-            LOG.debug("No CORS rule matches")
+            log_cors_decision((), decision=decision.outcome)
         return resp
 
     return cors_after_request
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+    Tests for the header cache
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import unittest
+
+from ..base_test import FlaskCorsTestCase
+from flask import Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.info(), CacheInfo(hits=3, misses=1, evictions=1, maxsize=2, currsize=2))
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.clear()
+        self.assertEqual(cache.info(), CacheInfo(hits=0, misses=0, evictions=0, maxsize=2, currsize=0))
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, LRUCache, 0)
+
+
+class HeaderCacheTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cors = CORS(self.app, header_cache_size=2, resources={
+            r'/foo': {'origins': ['http://foo.com', 'http://bar.com']},
+            r'/.*': {},
+        })
+
+        @self.app.route('/foo')
+        def foo():
+            return 'Welcome!'
+
+        @self.app.route('/bar')
+        def bar():
+            return 'Welcome!'
+
+        @self.app.route('/decorated')
+        @cross_origin(header_cache_size=10)
+        def decorated():
+            return 'Welcome!'
+
+        self.decorated = decorated
+
+    def test_cached_headers(self):
+        for _ in range(3):
+            resp = self.get('/foo', origin='http://foo.com')
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+            self.assertEqual(resp.headers.get('Vary'), 'Origin')
+        info = self.cors.header_cache.info()
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+    def test_cache_is_keyed_by_policy(self):
+        for _ in range(2):
+            self.assertEqual(self.get('/foo', origin='http://baz.com').headers.get(ACL_ORIGIN), None)
+            self.assertEqual(self.get('/bar', origin='http://baz.com').headers.get(ACL_ORIGIN), 'http://baz.com')
+        self.assertEqual(self.cors.header_cache.info().currsize, 2)
+
+    def test_cache_keyed_by_preflight_inputs(self):
+        resp = self.preflight('/foo', origin='http://foo.com', method='PUT', cors_request_headers=['X-Foo'])
+        self.assertEqual(resp.headers.get(ACL_ALLOW_HEADERS), 'X-Foo')
+        resp = self.preflight('/foo', origin='http://foo.com', method='PUT', cors_request_headers=['X-Bar'])
+        self.assertEqual(resp.headers.get(ACL_ALLOW_HEADERS), 'X-Bar')
+        resp = self.preflight('/foo', origin='http://foo.com', method='FOO', cors_request_headers=['X-Bar'])
+        self.assertFalse(ACL_ALLOW_HEADERS in resp.headers)
+        self.assertEqual(self.cors.header_cache.info().evictions, 1)
+
+    def test_decorator_cache(self):
+        for _ in range(2):
+            resp = self.get('/decorated', origin='http://foo.com')
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        info = self.decorated.header_cache.info()
+        self.assertEqual((info.hits, info.misses, info.maxsize), (1, 1, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
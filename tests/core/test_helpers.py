@@ -58,6 +58,16 @@ class InternalsTestCase(unittest.TestCase):
             'X-Bar, X-Foo'
         )
 
+    def test_get_allow_headers_wildcard(self):
+        options = serialize_options({'allow_headers': r'*'})
+        self.assertTrue(CorsPolicy(options).allow_headers.match_all)
+
+        for value in ['X-Foo', 'X-Foo,X-Bar', ' x-foo , X-Bar,', 'X-Foo, X-Foo']:
+            request_headers = [h.strip() for h in value.split(',')]
+            expected = ', '.join(sorted(h for h in request_headers
+                                        if try_match_any_pattern(h, options['allow_headers'], caseSensitive=False)))
+            self.assertEqual(get_allow_headers(options, value), expected)
+
     def test_get_allow_headers_matching_none(self):
         options = serialize_options({'allow_headers': r'X-FLASK-.*'})
 
@@ -68,6 +78,23 @@ class InternalsTestCase(unittest.TestCase):
             ''
         )
 
+    def test_get_allow_headers_memo(self):
+        policy = CorsPolicy(serialize_options({'allow_headers': ['X-Foo', r'X-Bar-\d+']}))
+
+        for _ in range(2):
+            self.assertEqual(get_allow_headers(policy, 'x-foo, X-BAR-1, X-Baz'), 'X-BAR-1, x-foo')
+        self.assertEqual(policy.allow_headers_memo.get('x-foo, X-BAR-1, X-Baz'), 'X-BAR-1, x-foo')
+
+        for i in range(ALLOW_HEADERS_MEMO_SIZE + 10):
+            self.assertEqual(get_allow_headers(policy, 'X-Bar-%d' % i), 'X-Bar-%d' % i)
+        info = policy.allow_headers_memo.info()
+        self.assertEqual((info.currsize, info.evictions), (ALLOW_HEADERS_MEMO_SIZE, 11))
+
+        # The least recently used values make room for new ones.
+        self.assertIsNone(policy.allow_headers_memo.get('X-Bar-0'))
+        self.assertEqual(policy.allow_headers_memo.get('X-Bar-%d' % (ALLOW_HEADERS_MEMO_SIZE + 9)),
+                         'X-Bar-%d' % (ALLOW_HEADERS_MEMO_SIZE + 9))
+
     def test_parse_resources_sorted(self):
         resources = parse_resources({
             '/foo': {'origins': 'http://foo.com'},
@@ -84,6 +111,33 @@ class InternalsTestCase(unittest.TestCase):
             ['/foo', re.compile(r'/api/v1/.*'), re.compile(r'/.*')]
         )
 
+    def test_pattern_matcher(self):
+        patterns = ['http://foo.com', r'http://.*\.bar\.com', re.compile(r'http://baz\d+\.com')]
+        matcher = PatternMatcher(patterns, caseSensitive=False)
+        for value in ['http://foo.com', 'HTTP://FOO.COM', 'http://api.bar.com',
+                      'http://API.BAR.COM', 'http://baz1.com', 'http://BAZ1.com',
+                      'http://qux.com', 'http://foo.co']:
+            self.assertEqual(matcher.match(value),
+                             bool(try_match_any_pattern(value, patterns, caseSensitive=False)),
+                             value)
+
+    def test_pattern_matcher_invalid_regex(self):
+        matcher = PatternMatcher(['http://foo.com', 'http://[bar.com'], caseSensitive=False)
+        self.assertTrue(matcher.match('http://foo.com'))
+        self.assertFalse(matcher.match('http://[bar.com'))
+
+    def test_combine_patterns(self):
+        regex = combine_patterns([re.compile('/api/v1/.*'), re.compile('/API', re.IGNORECASE)], ['a', 'b'])
+        self.assertEqual(regex.match('/api/v1/foo').lastgroup, 'a')
+        self.assertEqual(regex.match('/api/v2/foo').lastgroup, 'b')
+        self.assertIsNone(regex.match('/foo'))
+
+    def test_combine_patterns_uncombinable(self):
+        self.assertIsNone(combine_patterns([]))
+        self.assertIsNone(combine_patterns([re.compile(r'(a)\1')]))
+        self.assertIsNone(combine_patterns([re.compile(r'a # comment', re.VERBOSE)]))
+        self.assertIsNone(combine_patterns([re.compile(r'(?P<x>a)'), re.compile(r'(?P<x>b)')]))
+
     def test_probably_regex(self):
         self.assertTrue(probably_regex("http://*.example.com"))
         self.assertTrue(probably_regex("*"))
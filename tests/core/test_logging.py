@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+    Tests for the logged CORS decisions
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import logging
+
+from ..base_test import FlaskCorsTestCase
+from flask import Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+class DecisionLoggingTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        CORS(self.app, resources={r'/api/*': {'origins': 'http://foo.com', 'methods': ['GET']}})
+
+        @self.app.route('/api/foo')
+        def foo():
+            return 'Welcome!'
+
+        @self.app.route('/decorated')
+        @cross_origin()
+        def decorated():
+            return 'Welcome!'
+
+    def decisions(self, *args, **kwargs):
+        with self.assertLogs('flask_cors', level=logging.DEBUG) as logs:
+            getattr(self, kwargs.pop('verb', 'get'))(*args, **kwargs)
+        return [record.cors for record in logs.records]
+
+    def test_single_record_per_request(self):
+        records = self.decisions('/api/foo', origin='http://foo.com')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['decision'], 'allowed')
+        self.assertEqual(records[0]['resource'], '/api/*')
+        self.assertEqual(records[0]['origin'], 'http://foo.com')
+        self.assertEqual(records[0]['headers'][ACL_ORIGIN], 'http://foo.com')
+
+    def test_rejected_origin(self):
+        records = self.decisions('/api/foo', origin='http://bar.com')
+        self.assertEqual([r['decision'] for r in records], ['origin not allowed'])
+
+    def test_rejected_preflight(self):
+        records = self.decisions('/api/foo', verb='preflight', method='PUT', origin='http://foo.com')
+        self.assertEqual([r['decision'] for r in records], ['method not allowed'])
+        self.assertTrue(records[0]['preflight'])
+
+    def test_no_matching_resource(self):
+        records = self.decisions('/foo', origin='http://foo.com')
+        self.assertEqual([r['decision'] for r in records], ['no matching resource'])
+
+    def test_decorated(self):
+        records = self.decisions('/decorated', origin='http://bar.com')
+        self.assertEqual([r['decision'] for r in records], ['allowed'])
+
+
+if __name__ == "__main__":
+    unittest.main()
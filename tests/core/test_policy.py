@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+    Tests for the compiled CorsPolicy
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import unittest
+
+from werkzeug.datastructures import Headers, MultiDict
+
+from flask_cors.core import *
+
+
+class CorsPolicyTestCase(unittest.TestCase):
+    def test_policy_is_immutable(self):
+        policy = CorsPolicy(serialize_options(DEFAULT_OPTIONS))
+        with self.assertRaises(AttributeError):
+            policy.send_wildcard = True
+        with self.assertRaises(AttributeError):
+            policy.foo = 'bar'
+
+    def test_methods(self):
+        policy = CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, methods=['get', 'post'])))
+        self.assertEqual(policy.methods, frozenset(['GET', 'POST']))
+        self.assertEqual(policy.methods_header, 'GET, POST')
+
+    def test_methods_string(self):
+        policy = CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, methods='GET,PUT')))
+        self.assertEqual(policy.methods, frozenset(['GET', 'PUT']))
+        self.assertEqual(policy.methods_header, 'GET,PUT')
+
+    def test_vary(self):
+        def vary(**kwargs):
+            return CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, **kwargs))).vary
+
+        self.assertTrue(vary())
+        self.assertFalse(vary(origins='http://foo.com'))
+        self.assertTrue(vary(origins=['http://foo.com', 'http://bar.com']))
+        self.assertTrue(vary(origins=r'http://.*\.foo\.com'))
+        self.assertFalse(vary(origins=['http://foo.com', 'http://bar.com'], vary_header=False))
+        self.assertFalse(vary(origins=['http://foo.com', 'http://foo.com']))
+
+    def test_constant_headers(self):
+        def policy(**kwargs):
+            return CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, **kwargs)))
+
+        wildcard = policy(send_wildcard=True, max_age=600)
+        self.assertEqual(wildcard.constant_origin, '*')
+        self.assertIs(get_cors_header_list(wildcard, 'http://foo.com', 'GET', None, None, False),
+                      wildcard.constant_headers)
+        self.assertEqual(get_cors_header_list(wildcard, 'http://bar.com', 'OPTIONS', 'PUT', 'X-Foo', False),
+                         ((ACL_ORIGIN, '*'), (ACL_ALLOW_HEADERS, 'X-Foo'), (ACL_MAX_AGE, '600'),
+                          (ACL_METHODS, wildcard.methods_header)))
+
+        literal = policy(origins='http://foo.com')
+        self.assertEqual(literal.constant_origin, 'http://foo.com')
+        self.assertIs(get_cors_header_list(literal, 'http://foo.com', 'GET', None, None, False),
+                      literal.constant_headers)
+        self.assertEqual(get_cors_header_list(literal, 'http://bar.com', 'GET', None, None, False), ())
+
+        self.assertIsNone(policy().constant_origin)
+        self.assertIsNone(policy(origins=['http://foo.com', 'http://bar.com']).constant_origin)
+
+    def test_empty_values_are_dropped(self):
+        policy = CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, expose_headers=[], max_age=0)))
+        self.assertIsNone(policy.expose_headers)
+        self.assertIsNone(policy.max_age)
+
+    def test_policy_and_dict_agree(self):
+        options = serialize_options(dict(DEFAULT_OPTIONS,
+                                         origins=['http://foo.com', r'http://.*\.bar\.com'],
+                                         methods=['GET', 'PUT'],
+                                         max_age=600))
+        policy = CorsPolicy(options)
+        request_headers = Headers({
+            'Origin': 'http://api.bar.com',
+            ACL_REQUEST_METHOD: 'PUT',
+            ACL_REQUEST_HEADERS: 'X-Foo, Content-Type',
+        })
+        self.assertEqual(get_cors_headers(policy, request_headers, 'OPTIONS'),
+                         get_cors_headers(options, request_headers, 'OPTIONS'))
+        self.assertEqual(get_cors_headers(policy, request_headers, 'OPTIONS').get(ACL_METHODS), 'GET, PUT')
+
+    def test_no_origin_headers(self):
+        def policy(**kwargs):
+            return CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, **kwargs)))
+
+        self.assertEqual(policy().no_origin_headers, ((ACL_ORIGIN, '*'),))
+        self.assertEqual(policy(origins=['http://foo.com', r'http://.*\.bar\.com']).no_origin_headers,
+                         ((ACL_ORIGIN, 'http://foo.com'), ('Vary', 'Origin')))
+        self.assertEqual(policy(always_send=False).no_origin_headers, ())
+        self.assertEqual(policy(supports_credentials=True).no_origin_headers, ())
+
+        compiled = policy(origins='http://foo.com', header_cache_size=10)
+        self.assertIs(get_cors_header_list(compiled, None, 'GET', None, None, False), compiled.no_origin_headers)
+        self.assertIs(get_cors_header_list(compiled, '', 'OPTIONS', None, None, False), compiled.no_origin_headers)
+        self.assertEqual(compiled.header_cache.info().currsize, 0)
+
+    def test_method_is_not_a_substring_match(self):
+        policy = CorsPolicy(serialize_options(DEFAULT_OPTIONS))
+        request_headers = Headers({'Origin': 'http://foo.com', ACL_REQUEST_METHOD: 'GE'})
+        self.assertNotIn(ACL_METHODS, get_cors_headers(policy, request_headers, 'OPTIONS'))
+
+
+class AddCorsHeadersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.policy = CorsPolicy(serialize_options(dict(DEFAULT_OPTIONS, supports_credentials=True)))
+
+    def test_add_to_headers(self):
+        headers = Headers([('Content-Type', 'text/plain')])
+        add_cors_headers(headers, get_cors_header_list(self.policy, 'http://foo.com', 'GET', None, None, False))
+        self.assertEqual(list(headers.items()), [
+            ('Content-Type', 'text/plain'),
+            (ACL_ORIGIN, 'http://foo.com'),
+            (ACL_CREDENTIALS, 'true'),
+            ('Vary', 'Origin'),
+        ])
+
+    def test_add_to_multidict(self):
+        headers = MultiDict()
+        add_cors_headers(headers, get_cors_header_list(self.policy, 'http://foo.com', 'GET', None, None, False))
+        self.assertEqual(headers.get(ACL_ORIGIN), 'http://foo.com')
+
+    def test_newlines_are_rejected(self):
+        with self.assertRaises(ValueError):
+            get_cors_header_list(self.policy, 'http://foo.com\r\nX-Foo: bar', 'GET', None, None, False)
+
+
+if __name__ == "__main__":
+    unittest.main()
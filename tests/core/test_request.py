@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+    Tests for reading the CORS inputs of a request
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+import unittest
+
+from flask import Flask, request
+
+from flask_cors.core import *
+
+
+class CorsRequestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def test_matches_request(self):
+        headers = {
+            'Origin': 'http://foo.com',
+            ACL_REQUEST_METHOD: 'PUT',
+            ACL_REQUEST_HEADERS: 'X-Foo, X-Bar',
+            ACL_REQUEST_HEADER_PRIVATE_NETWORK: 'true',
+        }
+        with self.app.test_request_context('/foo/bär', method='options', headers=headers):
+            cors_request = get_cors_request()
+            self.assertEqual(cors_request.method, request.method)
+            self.assertEqual(cors_request.path, request.path)
+            self.assertEqual(cors_request.origin, 'http://foo.com')
+            self.assertEqual(cors_request.acl_request_method, 'PUT')
+            self.assertEqual(cors_request.acl_request_headers, 'X-Foo, X-Bar')
+            self.assertTrue(cors_request.acl_request_private_network)
+            self.assertTrue(cors_request.preflight)
+
+    def test_missing_headers(self):
+        with self.app.test_request_context('/', method='OPTIONS'):
+            cors_request = get_cors_request()
+            self.assertIsNone(cors_request.origin)
+            self.assertIsNone(cors_request.acl_request_method)
+            self.assertIsNone(cors_request.acl_request_headers)
+            self.assertFalse(cors_request.acl_request_private_network)
+            self.assertFalse(cors_request.preflight)
+
+    def test_read_once_per_request(self):
+        with self.app.test_request_context('/'):
+            self.assertIs(get_cors_request(), get_cors_request())
+        with self.app.test_request_context('/'):
+            first = get_cors_request()
+        with self.app.test_request_context('/'):
+            self.assertIsNot(get_cors_request(), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from ..base_test import FlaskCorsTestCase
+from flask import Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+@cross_origin()
+def shared_view():
+    return 'Welcome!'
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    app.add_url_rule('/', view_func=shared_view)
+    return app
+
+
+class AppConfigTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = make_app(CORS_ORIGINS='http://foo.com')
+
+    def test_app_config(self):
+        resp = self.get('/', origin='http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+        resp = self.get('/', origin='http://bar.com')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+    def test_app_config_change(self):
+        '''
+            Options are compiled once per application, but changes to the
+            CORS_* configuration must still take effect.
+        '''
+        self.assertFalse(ACL_ORIGIN in self.get('/', origin='http://bar.com').headers)
+
+        self.app.config['CORS_ORIGINS'] = ['http://foo.com', 'http://bar.com']
+        resp = self.get('/', origin='http://bar.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+
+        del self.app.config['CORS_ORIGINS']
+        resp = self.get('/', origin='http://baz.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://baz.com')
+
+    def test_app_config_mutated_in_place(self):
+        self.app.config['CORS_ORIGINS'] = ['http://foo.com']
+        self.assertFalse(ACL_ORIGIN in self.get('/', origin='http://bar.com').headers)
+
+        self.app.config['CORS_ORIGINS'].append('http://bar.com')
+        resp = self.get('/', origin='http://bar.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+
+        self.app.config['CORS_RESOURCES'] = {r'/*': {'origins': 'http://foo.com'}}
+        snapshot = get_app_config_snapshot(self.app)
+        self.assertFalse(app_config_changed(self.app, snapshot))
+        self.app.config['CORS_RESOURCES'][r'/api/*'] = {'origins': 'http://bar.com'}
+        self.assertTrue(app_config_changed(self.app, snapshot))
+
+    def test_multiple_apps(self):
+        '''
+            A single decorated view may be served by several applications,
+            each with their own configuration.
+        '''
+        other_app = make_app(CORS_ORIGINS='http://bar.com')
+
+        for _ in range(2):
+            resp = self.get('/', origin='http://bar.com')
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+
+            with other_app.test_client() as c:
+                resp = c.get('/', headers={'Origin': 'http://bar.com'})
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+
+
+if __name__ == "__main__":
+    unittest.main()
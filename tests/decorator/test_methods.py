@@ -57,5 +57,37 @@ class MethodsCase(FlaskCorsTestCase):
         res = self.get('/test_methods_defined', origin='www.example.com')
         self.assertFalse(ACL_METHODS in res.headers)
 
+
+class RouteMethodsCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/items', methods=['GET', 'POST'])
+        @cross_origin(route_methods=True)
+        def items():
+            return 'Welcome!'
+
+        @self.app.route('/items/<int:item_id>', methods=['GET', 'DELETE'])
+        @cross_origin(route_methods=True, methods=['GET', 'PUT'])
+        def item(item_id):
+            return 'Welcome!'
+
+    def test_route_methods(self):
+        resp = self.preflight('/items', 'POST', origin='http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_METHODS), 'GET, HEAD, OPTIONS, POST')
+
+        resp = self.preflight('/items', 'PUT', origin='http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+    def test_intersected_with_methods_option(self):
+        for item_id in range(2):
+            resp = self.preflight('/items/%d' % item_id, 'GET', origin='http://foo.com')
+            self.assertEqual(resp.headers.get(ACL_METHODS), 'GET')
+
+        resp = self.preflight('/items/1', 'DELETE', origin='http://foo.com')
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -77,5 +77,66 @@ class OptionsTestCase(FlaskCorsTestCase):
         self.assertTrue(ACL_ORIGIN in resp.headers)
         self.assertEqual(resp.data.decode("utf-8"), u"Welcome!")
 
+
+class AllowedMethodsTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.make_default_options_response_calls = []
+        make_default_options_response = self.app.make_default_options_response
+
+        def counting_make_default_options_response():
+            self.make_default_options_response_calls.append(True)
+            return make_default_options_response()
+
+        self.app.make_default_options_response = counting_make_default_options_response
+
+        @self.app.route('/fixed', methods=['GET', 'PUT'])
+        @cross_origin()
+        def fixed():
+            return 'Welcome!'
+
+        @self.app.route('/fixed', methods=['DELETE'])
+        def fixed_delete():
+            return 'Deleted!'
+
+        @self.app.route('/items/<int:item_id>')
+        @cross_origin()
+        def item(item_id):
+            return 'Welcome!'
+
+    def test_allow_header(self):
+        resp = self.preflight('/fixed', method='PUT', origin='http://foo.com')
+        self.assertEqual(resp.headers.get('Allow'), 'DELETE, GET, HEAD, OPTIONS, PUT')
+
+    def test_found_once_per_static_rule(self):
+        for _ in range(3):
+            resp = self.preflight('/fixed', method='PUT', origin='http://foo.com')
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self.make_default_options_response_calls), 1)
+
+        for item_id in range(2):
+            resp = self.preflight('/items/%d' % item_id, origin='http://foo.com')
+            self.assertEqual(resp.headers.get('Allow'), 'GET, HEAD, OPTIONS')
+        self.assertEqual(len(self.make_default_options_response_calls), 3)
+
+    def test_overridden_default_options_response(self):
+        class CustomFlask(Flask):
+            def make_default_options_response(self):
+                resp = super().make_default_options_response()
+                resp.headers['X-Custom'] = 'true'
+                return resp
+
+        self.app = CustomFlask(__name__)
+
+        @self.app.route('/')
+        @cross_origin()
+        def index():
+            return 'Welcome!'
+
+        resp = self.preflight('/', origin='http://foo.com')
+        self.assertEqual(resp.headers.get('X-Custom'), 'true')
+        self.assertTrue(ACL_ORIGIN in resp.headers)
+
+
 if __name__ == "__main__":
     unittest.main()
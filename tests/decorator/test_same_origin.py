@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from ..base_test import FlaskCorsTestCase
+from flask import Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+class SameOriginTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/skip_same_origin')
+        @cross_origin(skip_same_origin=True)
+        def skip_same_origin():
+            return 'Welcome!'
+
+        @self.app.route('/trust_fetch_metadata')
+        @cross_origin(trust_fetch_metadata=True)
+        def trust_fetch_metadata():
+            return 'Welcome!'
+
+        @self.app.route('/default')
+        @cross_origin()
+        def default():
+            return 'Welcome!'
+
+    def test_same_origin(self):
+        # The test client's requests are to http://localhost
+        resp = self.get('/skip_same_origin', origin='http://LOCALHOST')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+        self.assertFalse('Vary' in resp.headers)
+
+        resp = self.get('/default', origin='http://localhost')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://localhost')
+
+    def test_cross_origin(self):
+        for origin in ['https://localhost', 'http://localhost:8080', 'http://foo.com']:
+            resp = self.get('/skip_same_origin', origin=origin)
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), origin)
+
+    def test_fetch_metadata(self):
+        for headers in [{'Sec-Fetch-Site': 'same-origin'}, {'Sec-Fetch-Mode': 'navigate'}]:
+            resp = self.get('/trust_fetch_metadata', origin='http://foo.com', headers=headers)
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+
+            resp = self.get('/default', origin='http://foo.com', headers=headers)
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+        resp = self.get('/trust_fetch_metadata', origin='http://foo.com', headers={'Sec-Fetch-Site': 'cross-site'})
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+
+if __name__ == "__main__":
+    unittest.main()
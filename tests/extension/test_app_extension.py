@@ -10,11 +10,14 @@
 """
 
 import re
+import unittest
+
 from ..base_test import FlaskCorsTestCase
 from flask import Flask, jsonify
 
 from flask_cors import *
 from flask_cors.core import *
+from flask_cors.extension import make_resource_lookup
 
 letters = 'abcdefghijklmnopqrstuvwxyz'  # string.letters is not PY3 compatible
 
@@ -434,5 +437,133 @@ class AppExtensionPlusInPath(FlaskCorsTestCase):
         self.assertIsNone(response.headers.get(ACL_ORIGIN))
 
 
+class AppExtensionResourceIndex(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        CORS(self.app, resources={
+            r'/api/public': {'origins': 'http://public.com'},
+            r'/api/users/1.*': {'origins': 'http://one.com'},
+            r'/api/.*': {'origins': 'http://api.com'},
+        })
+
+        @self.app.route('/api/public')
+        @self.app.route('/api/other')
+        def shared_endpoint():
+            return 'Welcome!'
+
+        @self.app.route('/api/users/<int:user_id>')
+        def user(user_id):
+            return 'Welcome!'
+
+    def test_static_rules_sharing_an_endpoint(self):
+        '''
+            Resources are matched by path, even if several rules are routed
+            to the same endpoint, and stay correct once they are indexed.
+        '''
+        for _ in range(2):
+            resp = self.get('/api/public', origin='http://public.com')
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://public.com')
+            resp = self.get('/api/other', origin='http://public.com')
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+            resp = self.get('/api/other', origin='http://api.com')
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://api.com')
+
+    def test_rule_with_variables(self):
+        for _ in range(2):
+            resp = self.get('/api/users/12', origin='http://one.com')
+            self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://one.com')
+            resp = self.get('/api/users/2', origin='http://one.com')
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+
+    def test_not_found(self):
+        resp = self.get('/api/missing', origin='http://api.com')
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://api.com')
+
+
+class ResourceLookupTestCase(unittest.TestCase):
+    def lookup(self, resources, path):
+        resource = make_resource_lookup(parse_resources(resources))(path, None)
+        return resource and get_regexp_pattern(resource[0])
+
+    def test_specificity_order(self):
+        resources = {
+            r'/api/.*': {},
+            r'/api/v1/.*': {},
+            r'/api/v1/users': {},
+            re.compile(r'/api/v1/users/\d+'): {},
+        }
+        self.assertEqual(self.lookup(resources, '/api/v1/users'), '/api/v1/users')
+        self.assertEqual(self.lookup(resources, '/api/v1/users/1'), r'/api/v1/users/\d+')
+        self.assertEqual(self.lookup(resources, '/api/v1/foo'), '/api/v1/.*')
+        self.assertEqual(self.lookup(resources, '/api/v2/foo'), '/api/.*')
+        self.assertIsNone(self.lookup(resources, '/foo'))
+
+    def test_list_order(self):
+        '''
+            Resources given as a list are not sorted, so a regex listed before
+            a literal path takes precedence over it.
+        '''
+        self.assertEqual(self.lookup([r'/api/.*', '/api/foo'], '/api/foo'), '/api/.*')
+        self.assertEqual(self.lookup(['/api/foo', r'/api/.*'], '/api/foo'), '/api/foo')
+
+    def test_uncombinable_regexes(self):
+        resources = [r'/(a)\1', r'/(?P<x>b)', r'/(?P<x>c)']
+        self.assertEqual(self.lookup(resources, '/aa'), r'/(a)\1')
+        self.assertEqual(self.lookup(resources, '/c'), r'/(?P<x>c)')
+        self.assertIsNone(self.lookup(resources, '/a'))
+
+    def test_escaped_path(self):
+        self.assertEqual(self.lookup([r'/api/.*'], '/api/%2e%2e/foo'), '/api/.*')
+        self.assertEqual(self.lookup(['/service path'], '/service%20path'), '/service path')
+
+
+class AppExtensionSameOriginTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['CORS_SKIP_SAME_ORIGIN'] = True
+        CORS(self.app)
+
+        @self.app.route('/')
+        def index():
+            return 'Welcome!'
+
+    def test_same_origin(self):
+        self.assertFalse(ACL_ORIGIN in self.get('/', origin='http://localhost').headers)
+        self.assertEqual(self.get('/', origin='http://foo.com').headers.get(ACL_ORIGIN), 'http://foo.com')
+
+
+class AppExtensionExcludeTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        CORS(self.app, exclude_paths='/healthz', exclude_endpoints=['metrics'],
+             intercept_preflight=True)
+
+        @self.app.route('/healthz')
+        def healthz():
+            return 'OK'
+
+        @self.app.route('/internal/metrics')
+        def metrics():
+            return 'OK'
+
+        @self.app.route('/api')
+        def api():
+            return 'Welcome!'
+
+    def test_excluded(self):
+        for path in ['/healthz', '/internal/metrics']:
+            resp = self.get(path, origin='http://foo.com')
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+
+            resp = self.preflight(path, origin='http://foo.com')
+            self.assertEqual(resp.status_code, 200)
+            self.assertFalse(ACL_ORIGIN in resp.headers)
+
+    def test_not_excluded(self):
+        self.assertEqual(self.get('/api', origin='http://foo.com').headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertEqual(self.get('/healthz/', origin='http://foo.com').headers.get(ACL_ORIGIN), 'http://foo.com')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from ..base_test import FlaskCorsTestCase
+from flask import Blueprint, Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+class CurrentDecisionTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cors = CORS(self.app, resources={r'/api/*': {'origins': ['http://foo.com', 'http://baz.com']}},
+                         header_cache_size=10, exclude_paths='/healthz')
+        self.decisions = []
+
+        @self.app.route('/api/')
+        def api():
+            self.decisions.append(current_decision())
+            return 'Welcome!'
+
+        @self.app.route('/other')
+        def other():
+            self.decisions.append(current_decision())
+            return 'Welcome!'
+
+        @self.app.route('/healthz')
+        def healthz():
+            self.decisions.append(current_decision())
+            return 'OK'
+
+        @self.app.route('/decorated')
+        @cross_origin(origins='http://bar.com')
+        def decorated():
+            self.decisions.append(current_decision())
+            return 'Welcome!'
+
+    def test_allowed(self):
+        resp = self.get('/api/', origin='http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+        decision, = self.decisions
+        self.assertTrue(decision.allowed)
+        self.assertEqual(decision.allowed_origin, 'http://foo.com')
+        self.assertEqual(decision.origin, 'http://foo.com')
+        self.assertEqual(decision.resource, r'/api/*')
+        self.assertEqual(decision.outcome, 'allowed')
+        self.assertFalse(decision.preflight)
+
+    def test_made_once(self):
+        self.get('/api/', origin='http://foo.com')
+        # The decision made in the view is reused for the response.
+        info = self.cors.header_cache.info()
+        self.assertEqual((info.hits, info.misses), (0, 1))
+
+    def test_not_allowed(self):
+        resp = self.get('/api/', origin='http://bar.com')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+        decision, = self.decisions
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.outcome, 'origin not allowed')
+
+    def test_no_matching_resource(self):
+        self.get('/other', origin='http://foo.com')
+        decision, = self.decisions
+        self.assertIsNone(decision.policy)
+        self.assertEqual(decision.outcome, 'no matching resource')
+
+    def test_excluded(self):
+        self.get('/healthz', origin='http://foo.com')
+        self.assertEqual(self.decisions, [None])
+
+    def test_decision_is_immutable(self):
+        self.get('/api/', origin='http://foo.com')
+        with self.assertRaises(AttributeError):
+            self.decisions[0].foo = 'bar'
+
+    def test_decorator(self):
+        # The decorated view sees the decision of the decorator's policy,
+        # which is the one its response's headers are set from.
+        resp = self.get('/decorated', origin='http://bar.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+
+        decision, = self.decisions
+        self.assertTrue(decision.allowed)
+        self.assertEqual(decision.headers, ((ACL_ORIGIN, 'http://bar.com'),))
+
+    def test_decorator_not_allowed(self):
+        resp = self.get('/decorated', origin='http://evil.com')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+        decision, = self.decisions
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.outcome, 'origin not allowed')
+
+
+class DecoratedViewDecisionTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.decisions = []
+
+        # Registered before CORS, so it runs after the extension's
+        # after_request function.
+        @self.app.after_request
+        def record_decision(resp):
+            self.decisions.append(get_cors_request().decision)
+            return resp
+
+        CORS(self.app, origins='*')
+
+        @self.app.route('/')
+        @cross_origin(origins='http://a.com')
+        def index():
+            return 'Welcome!'
+
+    def test_rejected_by_decorator(self):
+        resp = self.get('/', origin='http://evil.com')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+        decision, = self.decisions
+        self.assertFalse(decision.allowed)
+        self.assertEqual(decision.outcome, 'origin not allowed')
+
+
+class BlueprintDecisionTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.decisions = []
+        api = Blueprint('api', __name__)
+        CORS(api)
+
+        @api.route('/api/')
+        def index():
+            self.decisions.append(current_decision())
+            return 'Welcome!'
+
+        self.app.register_blueprint(api)
+
+    def test_blueprint(self):
+        resp = self.get('/api/', origin='http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertEqual(self.decisions, [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+    test
+    ~~~~
+    Flask-CORS is a simple extension to Flask allowing you to support cross
+    origin resource sharing (CORS) using a simple decorator.
+
+    :copyright: (c) 2016 by Cory Dolphin.
+    :license: MIT, see LICENSE for more details.
+"""
+
+from ..base_test import FlaskCorsTestCase
+from flask import Flask
+
+from flask_cors import *
+from flask_cors.core import *
+
+
+class InterceptPreflightTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.before_request_calls = []
+        self.view_calls = []
+
+        @self.app.before_request
+        def before_request():
+            self.before_request_calls.append(True)
+
+        CORS(self.app, intercept_preflight=True, origins=['http://foo.com'], methods=['GET', 'PUT'], max_age=600)
+
+        @self.app.route('/')
+        def index():
+            self.view_calls.append(True)
+            return 'Welcome!'
+
+        @self.app.route('/custom_options', methods=['GET', 'OPTIONS'])
+        def custom_options():
+            self.view_calls.append(True)
+            return 'Custom!'
+
+        @self.app.route('/decorated')
+        @cross_origin(origins='http://bar.com')
+        def decorated():
+            return 'Welcome!'
+
+    def test_preflight_is_intercepted(self):
+        resp = self.preflight('/', method='PUT', origin='http://foo.com', cors_request_headers=['X-Foo'])
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(resp.data, b'')
+        self.assertFalse('Content-Type' in resp.headers)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertEqual(resp.headers.get(ACL_METHODS), 'GET, PUT')
+        self.assertEqual(resp.headers.get(ACL_ALLOW_HEADERS), 'X-Foo')
+        self.assertEqual(resp.headers.get(ACL_MAX_AGE), '600')
+        self.assertEqual(self.before_request_calls, [])
+
+    def test_invalid_preflight_is_not_intercepted(self):
+        resp = self.preflight('/', method='DELETE', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+        resp = self.preflight('/', method='PUT', origin='http://bar.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+        self.assertEqual(len(self.before_request_calls), 2)
+
+    def test_not_a_preflight(self):
+        resp = self.options('/', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertEqual(len(self.before_request_calls), 1)
+
+        resp = self.get('/', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.view_calls, [True])
+
+    def test_view_handling_options(self):
+        resp = self.preflight('/custom_options', method='PUT', origin='http://foo.com')
+        self.assertEqual(resp.data, b'Custom!')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+    def test_decorated_view(self):
+        resp = self.preflight('/decorated', method='PUT', origin='http://bar.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+
+    def test_not_found(self):
+        resp = self.preflight('/missing', method='PUT', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+
+
+class PreflightCacheTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cors = CORS(self.app, intercept_preflight=True, preflight_cache_size=10)
+
+        @self.app.route('/')
+        def index():
+            return 'Welcome!'
+
+    def test_cached_preflight(self):
+        first = self.preflight('/', method='PUT', origin='http://foo.com', cors_request_headers=['X-Foo', 'X-Bar'])
+        second = self.preflight('/', method='put', origin='http://foo.com', cors_request_headers=['X-Bar', ' X-Foo'])
+        self.assertEqual(second.status_code, 204)
+        self.assertEqual(second.headers.get(ACL_ALLOW_HEADERS), 'X-Bar, X-Foo')
+        self.assertEqual(list(first.headers.items()), list(second.headers.items()))
+
+        info = self.cors.preflight_cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_only_cors_headers_cached(self):
+        self.preflight('/', method='PUT', origin='http://foo.com')
+        resp = self.preflight('/', method='PUT', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse('Content-Type' in resp.headers)
+
+        key, = self.cors.preflight_cache._data
+        self.assertTrue(all(name.startswith('Access-Control-') or name == 'Vary'
+                            for name, _ in self.cors.preflight_cache.get(key)))
+
+    def test_cache_keyed_by_origin(self):
+        self.preflight('/', method='PUT', origin='http://foo.com')
+        resp = self.preflight('/', method='PUT', origin='http://bar.com')
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://bar.com')
+        self.assertEqual(self.cors.preflight_cache.info().currsize, 2)
+
+    def test_cache_flushed_on_init_app(self):
+        self.preflight('/', method='PUT', origin='http://foo.com')
+        self.cors.init_app(Flask(__name__))
+        self.assertEqual(self.cors.preflight_cache.info().currsize, 0)
+
+
+class RejectPreflightTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.before_request_calls = []
+
+        self.decisions = []
+
+        @self.app.before_request
+        def before_request():
+            self.before_request_calls.append(True)
+
+        # Registered before CORS, so it runs after the extension's
+        # after_request function.
+        @self.app.after_request
+        def record_decision(resp):
+            self.decisions.append(get_cors_request().decision)
+            return resp
+
+        self.cors = CORS(self.app, reject_preflight_status=403, header_cache_size=10, resources={
+            r'/api/*': {'origins': ['http://foo.com', 'http://baz.com'], 'methods': ['GET', 'PUT']},
+            r'/public/*': {'reject_preflight_status': None},
+        })
+
+        @self.app.route('/api/')
+        def api():
+            return 'Welcome!'
+
+        @self.app.route('/public/')
+        def public():
+            return 'Welcome!'
+
+    def test_disallowed_origin(self):
+        resp = self.preflight('/api/', method='PUT', origin='http://bar.com')
+        self.assertEqual(resp.status_code, 403)
+        self.assertEqual(resp.data, b'')
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+        self.assertEqual(self.before_request_calls, [])
+
+    def test_rejection_is_not_evaluated_again(self):
+        for method, origin in [('PUT', 'http://bar.com'), ('DELETE', 'http://foo.com')]:
+            self.assertEqual(self.preflight('/api/', method=method, origin=origin).status_code, 403)
+        self.assertEqual(self.decisions, [None, None])
+        info = self.cors.header_cache.info()
+        self.assertEqual((info.hits, info.misses), (0, 0))
+
+    def test_disallowed_method(self):
+        resp = self.preflight('/api/', method='DELETE', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 403)
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+    def test_allowed_preflight_is_not_intercepted(self):
+        resp = self.preflight('/api/', method='PUT', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers.get(ACL_ORIGIN), 'http://foo.com')
+        self.assertEqual(len(self.before_request_calls), 1)
+
+    def test_resource_without_status(self):
+        resp = self.preflight('/public/', method='FOO', origin='http://bar.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+    def test_with_intercept_preflight(self):
+        self.app = Flask(__name__)
+        CORS(self.app, intercept_preflight=True, reject_preflight_status=204, origins=['http://foo.com'])
+
+        @self.app.route('/')
+        def index():
+            return 'Welcome!'
+
+        self.assertEqual(self.preflight('/', method='PUT', origin='http://foo.com').status_code, 204)
+        resp = self.preflight('/', method='PUT', origin='http://bar.com')
+        self.assertEqual(resp.status_code, 204)
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+
+class SameOriginPreflightTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        CORS(self.app, skip_same_origin=True, trust_fetch_metadata=True, intercept_preflight=True,
+             reject_preflight_status=403, origins=['http://foo.com'])
+
+        @self.app.route('/')
+        def index():
+            return 'Welcome!'
+
+    def test_same_origin(self):
+        # The test client's requests are to http://localhost
+        resp = self.preflight('/', method='PUT', origin='http://localhost')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+    def test_fetch_metadata(self):
+        resp = self.preflight('/', method='PUT', origin='http://foo.com', headers={'Sec-Fetch-Site': 'same-origin'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_ORIGIN in resp.headers)
+
+    def test_cross_origin(self):
+        self.assertEqual(self.preflight('/', method='PUT', origin='http://foo.com').status_code, 204)
+        self.assertEqual(self.preflight('/', method='PUT', origin='http://bar.com').status_code, 403)
+
+
+class RouteMethodsTestCase(FlaskCorsTestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        CORS(self.app, route_methods=True, intercept_preflight=True, preflight_cache_size=10)
+
+        @self.app.route('/', methods=['GET', 'PUT'])
+        def index():
+            return 'Welcome!'
+
+        @self.app.route('/', methods=['DELETE'], endpoint='delete_index')
+        def delete_index():
+            return 'Deleted!'
+
+    def test_route_methods(self):
+        resp = self.preflight('/', method='DELETE', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(resp.headers.get(ACL_METHODS), 'DELETE, GET, HEAD, OPTIONS, PUT')
+
+    def test_method_not_routed(self):
+        resp = self.preflight('/', method='PATCH', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(ACL_METHODS in resp.headers)
+
+    def test_not_found(self):
+        resp = self.preflight('/missing', method='PATCH', origin='http://foo.com')
+        self.assertEqual(resp.status_code, 404)
+        self.assertTrue(ACL_METHODS in resp.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()